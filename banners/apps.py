@@ -5,3 +5,6 @@ class BannersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "banners"
     verbose_name = "Banners Editáveis"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -4,6 +4,8 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from banners.models import Banner
 from banners.serializers import BannerSerializer
+from core.conditional import conditional_get
+from core.response_cache import cache_response
 
 
 class BannerListAPIView(APIView):
@@ -13,8 +15,13 @@ class BannerListAPIView(APIView):
 
     permission_classes = [AllowAny]
 
+    def get_etag_queryset(self, request):
+        return Banner.objects.filter(is_active=True)
+
+    @conditional_get(Banner)
+    @cache_response(Banner)
     def get(self, request):
-        banners = Banner.objects.filter(is_active=True).order_by("order", "-created_at")
+        banners = self.get_etag_queryset(request).order_by("order", "-created_at")
 
         serializer = BannerSerializer(banners, many=True, context={"request": request})
         return Response(serializer.data)
@@ -27,6 +34,7 @@ class BannerDetailAPIView(APIView):
 
     permission_classes = [AllowAny]
 
+    @cache_response(Banner)
     def get(self, request, pk):
         try:
             banner = Banner.objects.get(pk=pk, is_active=True)
@@ -45,6 +53,7 @@ class CollectionBannerAPIView(APIView):
 
     permission_classes = [AllowAny]
 
+    @cache_response(Banner)
     def get(self, request):
         banner = (
             Banner.objects.filter(is_active=True)
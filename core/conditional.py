@@ -0,0 +1,92 @@
+"""Conditional GET (ETag / If-None-Match) for public read-only API views.
+
+The validator is computed from the view's filtered queryset with a single
+aggregate, MAX(updated_at) and COUNT(*), plus the response cache key (host,
+path, normalized params and the versions of the models the payload reads). A
+matching If-None-Match is answered with 304 before the view serializes anything.
+
+updated_at catches edits, COUNT catches deletions and rows leaving the filter,
+and the model versions catch writes that do not touch the filtered rows
+themselves (collection renames, markup changes, bulk writers). Those versions
+are per process on a local-memory cache, so ETags are only emitted when the
+cache is shared (core.response_cache.cache_is_shared).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from functools import wraps
+from typing import Optional, Type
+
+from django.db import models
+from django.db.models import Count, Max
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .response_cache import cache_is_shared, response_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+def queryset_etag(
+    request, queryset, model_list=(), updated_field: str = "updated_at"
+) -> str:
+    """Weak ETag for the current state of queryset as requested by request."""
+    state = queryset.order_by().aggregate(last=Max(updated_field), n=Count("pk"))
+    last = state["last"].isoformat() if state["last"] else ""
+    raw = f"{response_cache_key(request, model_list)}|{last}|{state['n']}"
+    return 'W/"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """True when If-None-Match lists etag (or *), compared weakly."""
+    if not if_none_match:
+        return False
+    # Weak comparison (RFC 9110 13.1.2); nginx also weakens ETags it gzips
+    opaque = etag.removeprefix("W/")
+    for candidate in parse_etags(if_none_match):
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def conditional_get(
+    *model_list: Type[models.Model], cache_control: Optional[str] = "no-cache"
+):
+    """Answer If-None-Match with 304 and tag 200 responses with an ETag.
+
+    The view must implement get_etag_queryset(request, *args, **kwargs),
+    returning the queryset its payload is built from (already filtered).
+    Apply it outside cache_response so a 304 skips the response cache too.
+    Without a shared cache the view runs unconditionally, with no ETag.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not cache_is_shared():
+                return view_method(self, request, *args, **kwargs)
+            try:
+                queryset = self.get_etag_queryset(request, *args, **kwargs)
+                etag = queryset_etag(request, queryset, model_list)
+            except Exception as e:
+                # Invalid filter params and the like: let the view report them
+                logger.debug("etag not computed: %s", e)
+                return view_method(self, request, *args, **kwargs)
+
+            if etag_matches(etag, request.META.get("HTTP_IF_NONE_MATCH", "")):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+            response["ETag"] = etag
+            if cache_control and not response.has_header("Cache-Control"):
+                response["Cache-Control"] = cache_control
+            return response
+
+        return wrapper
+
+    return decorator
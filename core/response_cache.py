@@ -0,0 +1,128 @@
+"""Versioned cache for public read-only API responses.
+
+Each cached model has a version counter in the shared cache, bumped on every
+write (post_save/post_delete receivers in each app, plus bulk writers that skip
+signals). Response keys embed the current versions of the models a view reads,
+so a write makes every dependent entry unreachable at once; RESPONSE_CACHE_TIMEOUT
+only bounds how long unreachable entries linger.
+
+The counters only work when every web and Celery process shares the cache
+(CACHE_URL pointing at Redis). With a process-local backend a write in one
+process cannot invalidate another's entries, so caching is bypassed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from functools import wraps
+from typing import Iterable, Optional, Type
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Backends whose data lives inside a single process
+_PROCESS_LOCAL_BACKENDS = frozenset(
+    {
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    }
+)
+
+_VERSION_PREFIX = "resp:v"
+_RESPONSE_PREFIX = "resp"
+
+
+def cache_is_shared() -> bool:
+    """True when the default cache is visible to every web and worker process."""
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    return backend not in _PROCESS_LOCAL_BACKENDS
+
+
+def _version_key(model: Type[models.Model]) -> str:
+    return f"{_VERSION_PREFIX}:{model._meta.label_lower}"
+
+
+def bump_model_version(model: Type[models.Model]) -> None:
+    """Invalidate every cached response that depends on `model`."""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing (first write or evicted): start from a fresh, never-used value
+        cache.set(key, time.time_ns(), None)
+    except Exception as e:
+        logger.warning("response cache version bump failed for %s: %s", key, e)
+
+
+def bump_model_version_on_commit(model: Type[models.Model]) -> None:
+    """Bump after the current transaction commits, so readers racing the write
+    cannot cache pre-commit data under the new version.
+    """
+    transaction.on_commit(lambda: bump_model_version(model))
+
+
+def model_versions(model_list: Iterable[Type[models.Model]]) -> str:
+    keys = [_version_key(m) for m in model_list]
+    found = cache.get_many(keys)
+    missing = {k: time.time_ns() for k in keys if k not in found}
+    if missing:
+        # add() so concurrent first readers agree on a single initial version
+        for k, v in missing.items():
+            cache.add(k, v, None)
+        found.update(cache.get_many(list(missing)))
+    return ".".join(str(found.get(k, 0)) for k in keys)
+
+
+def response_cache_key(request, model_list: Iterable[Type[models.Model]]) -> str:
+    """Key from host, path, normalized query params (sorted, blanks dropped) and versions."""
+    params = sorted(
+        (k, sorted(v for v in values if v != ""))
+        for k, values in request.query_params.lists()
+    )
+    params = [(k, v) for k, v in params if v]
+    raw = f"{request.scheme}://{request.get_host()}{request.path}?{params!r}"
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f"{_RESPONSE_PREFIX}:{digest}:{model_versions(model_list)}"
+
+
+def cache_response(*model_list: Type[models.Model], timeout: Optional[int] = None):
+    """Cache successful GET responses of an APIView method until one of
+    model_list is written. A no-op unless cache_is_shared().
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not cache_is_shared():
+                return view_method(self, request, *args, **kwargs)
+            try:
+                key = response_cache_key(request, model_list)
+                cached = cache.get(key)
+            except Exception as e:
+                logger.warning("response cache unavailable: %s", e)
+                return view_method(self, request, *args, **kwargs)
+            if cached is not None:
+                return Response(cached)
+
+            response = view_method(self, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                ttl = (
+                    timeout
+                    if timeout is not None
+                    else getattr(settings, "RESPONSE_CACHE_TIMEOUT", 600)
+                )
+                try:
+                    cache.set(key, response.data, ttl)
+                except Exception as e:
+                    logger.warning("response cache write failed: %s", e)
+            return response
+
+        return wrapper
+
+    return decorator
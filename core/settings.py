@@ -105,6 +105,9 @@ if not USE_POSTGRES:
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
+    # Covering indexes (Index.include) are PostgreSQL-only; SQLite builds them without
+    # the extra columns, which is fine for local development
+    SILENCED_SYSTEM_CHECKS = ["models.W040"]
 else:
     DATABASES = {
         "default": {
@@ -297,12 +300,52 @@ CELERY_RESULT_EXPIRES = 3600
 
 # Configurações de Agendamento (Beat Schedule)
 CELERY_BEAT_SCHEDULE = {
-    # Rotina da madrugada - atualização de preços dos NFTs
-    "update-nft-prices-nightly": {
-        "task": "nft.tasks.update_all_nft_prices_nightly",
-        "schedule": 60.0 * 60.0 * 24.0,  # Executa a cada 24 horas
+    # Agendador adaptativo - envia os NFTs com atualização vencida aos workers
+    "schedule-nft-refreshes": {
+        "task": "nft.tasks.schedule_nft_refreshes",
+        "schedule": 60.0,  # Executa a cada minuto (NFT_ADAPTIVE_REFRESH["tick_seconds"])
         "options": {
-            "expires": 60 * 60 * 2,  # Expira em 2 horas se não executar
+            "expires": 50,  # Descarta se o próximo tick já estiver chegando
+        },
+    },
+    # Recalcula os intervalos por popularidade, vendas e volatilidade
+    "recompute-nft-refresh-intervals": {
+        "task": "nft.tasks.recompute_nft_refresh_intervals",
+        "schedule": 60.0 * 15.0,  # Executa a cada 15 minutos
+        "options": {
+            "expires": 60 * 10,
+        },
+    },
+    # Cotações ETH/USD e USD/BRL atualizadas antes do TTL de 3 minutos expirar
+    "refresh-fx-rates": {
+        "task": "nft.tasks.refresh_fx_rates",
+        "schedule": 120.0,  # Executa a cada 2 minutos
+        "options": {
+            "expires": 60,  # Descarta se não executar em 1 minuto
+        },
+    },
+    # Janela deslizante das métricas de venda de 7 dias (a partir do ledger NFTSale)
+    "roll-seven-day-sales-stats": {
+        "task": "nft.tasks.roll_seven_day_sales_stats",
+        "schedule": 60.0 * 60.0,  # Executa a cada hora
+        "options": {
+            "expires": 60 * 30,
+        },
+    },
+    # Compactação do histórico de preços (bruto -> hora -> dia)
+    "rollup-nft-price-history": {
+        "task": "nft.tasks.rollup_nft_price_history",
+        "schedule": 60.0 * 60.0,  # Executa a cada hora
+        "options": {
+            "expires": 60 * 30,
+        },
+    },
+    # Snapshot do autocomplete (as alterações chegam aos workers como deltas)
+    "rebuild-typeahead-index": {
+        "task": "nft.tasks.rebuild_typeahead_index",
+        "schedule": 60.0 * 60.0,  # Executa a cada hora
+        "options": {
+            "expires": 60 * 30,
         },
     },
     # Limpeza semanal de dados antigos
@@ -315,21 +358,103 @@ CELERY_BEAT_SCHEDULE = {
     },
 }
 
-# Configuração para usar crontab para horário específico (1h da manhã)
-from celery.schedules import crontab  # noqa: E402
-
-CELERY_BEAT_SCHEDULE.update(
-    {
-        # Rotina da madrugada às 1h00
-        "update-nft-prices-at-1am": {
-            "task": "nft.tasks.update_all_nft_prices_nightly",
-            "schedule": crontab(hour=1, minute=0),  # Executa diariamente às 1h00
-            "options": {
-                "expires": 60 * 60 * 2,  # Expira em 2 horas se não executar
-            },
-        },
+# A rotina completa (nft.tasks.update_all_nft_prices_nightly) não é mais agendada:
+# o agendador adaptativo garante ao menos uma atualização a cada max_interval.
+# Ela continua disponível via `manage.py nft_tasks run-now`.
+
+# Cache
+# Shared across gunicorn and Celery processes when CACHE_URL points to Redis
+# (e.g. redis://redis:6379/1); falls back to a per-process local-memory cache,
+# under which response caching and ETags are disabled (core.response_cache).
+CACHE_URL = os.getenv("CACHE_URL")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "KEY_PREFIX": "nft_portal",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
     }
+
+# Public read endpoints cache their responses (core.response_cache) until the
+# underlying models change; this only bounds how long superseded entries linger.
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "600"))
+
+# Outbound HTTP connection pooling (nft.http_client)
+# Pools are per process; each host keeps up to HTTP_POOL_MAXSIZE keep-alive connections.
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+HTTP_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "True").lower() in ("true", "1", "t")
+# Shared per-host request budget for outbound calls (nft.ratelimit):
+# each host gets `rate` requests per `period` seconds across all processes.
+UPSTREAM_RATE_LIMITS = {
+    "api.x.immutable.com": {
+        "rate": int(os.getenv("IMMUTABLE_RATE_LIMIT", "5")),
+        "period": 1.0,
+    },
+    "api.coingecko.com": {
+        "rate": int(os.getenv("COINGECKO_RATE_LIMIT", "10")),
+        "period": 60.0,
+    },
+    "economia.awesomeapi.com.br": {
+        "rate": int(os.getenv("AWESOMEAPI_RATE_LIMIT", "30")),
+        "period": 60.0,
+    },
+}
+# Max seconds a request waits for a token before failing with RateLimitTimeout
+UPSTREAM_RATE_LIMIT_MAX_WAIT = float(os.getenv("UPSTREAM_RATE_LIMIT_MAX_WAIT", "30"))
+# Same, for upstream calls made while serving an HTTP request (nft.ratelimit.request_wait)
+UPSTREAM_RATE_LIMIT_REQUEST_MAX_WAIT = float(
+    os.getenv("UPSTREAM_RATE_LIMIT_REQUEST_MAX_WAIT", "5")
 )
+# Circuit breaker for outbound calls (nft.circuitbreaker): opens when at least
+# min_requests were made in window_seconds and failure_rate of them failed;
+# probes again after open_seconds.
+CIRCUIT_BREAKER_HOSTS = [
+    "api.x.immutable.com",
+    "api.coingecko.com",
+    "economia.awesomeapi.com.br",
+]
+CIRCUIT_BREAKER = {
+    "failure_rate": float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5")),
+    "min_requests": int(os.getenv("CIRCUIT_BREAKER_MIN_REQUESTS", "10")),
+    "window_seconds": int(os.getenv("CIRCUIT_BREAKER_WINDOW_SECONDS", "60")),
+    "open_seconds": int(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30")),
+}
+# Product codes refreshed per chunk task (one Immutable query + one bulk write)
+NFT_REFRESH_CHUNK_SIZE = int(os.getenv("NFT_REFRESH_CHUNK_SIZE", "25"))
+# Adaptive refresh scheduler (nft.scheduler): per-item interval between
+# min_interval and max_interval seconds, shrunk by recent views, 7d sales and
+# price volatility; budget_share of the Immutable rate limit goes to refreshes.
+NFT_ADAPTIVE_REFRESH = {
+    "min_interval": int(os.getenv("NFT_REFRESH_MIN_INTERVAL", str(15 * 60))),
+    "max_interval": int(os.getenv("NFT_REFRESH_MAX_INTERVAL", str(24 * 60 * 60))),
+    "views_window_hours": 24,
+    "view_weight": 1.0,
+    "sales_weight": 1.0,
+    "volatility_weight": 50.0,
+    "volatility_alpha": 0.3,
+    "budget_share": float(os.getenv("NFT_REFRESH_BUDGET_SHARE", "0.8")),
+    "tick_seconds": 60,
+}
+# Price history retention (nft.history): raw observations are kept for raw_days,
+# then averaged per hour; hourly buckets are kept for hourly_days, then per day.
+NFT_PRICE_HISTORY = {
+    "raw_days": int(os.getenv("NFT_PRICE_HISTORY_RAW_DAYS", "7")),
+    "hourly_days": int(os.getenv("NFT_PRICE_HISTORY_HOURLY_DAYS", "90")),
+}
+# Seconds a paginated Immutable order query is reused from the shared cache
+# (nft.orderbook_cache); 0 disables the cache and request coalescing
+IMMUTABLE_ORDERBOOK_CACHE_TTL = int(os.getenv("IMMUTABLE_ORDERBOOK_CACHE_TTL", "30"))
+# Max seconds before a write shows up in every process's typeahead index
+# (nft.typeahead); each sync costs one cache read
+NFT_TYPEAHEAD_SYNC_SECONDS = float(os.getenv("NFT_TYPEAHEAD_SYNC_SECONDS", "1"))
 
 # Auth User Model
 AUTH_USER_MODEL = "accounts.User"
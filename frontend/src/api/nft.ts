@@ -58,6 +58,9 @@ export interface NFTItem {
   item_type: string;
   item_sub_type: string;
   material: string;
+  number?: number | null;
+  last_price_eth?: string | null; // numeric string
+  last_price_usd?: string | null; // numeric string
   last_price_brl: string | null; // numeric string
   updated_at: string;
   collection?: number | null;
@@ -87,12 +90,49 @@ export function fetchNFTItems(params?: HttpParams) {
   return getJson<Paginated<NFTItem>>(`/nft/items/`, params);
 }
 
+// GET /nft/items/facets/ with the same filters: counts per value for the sidebar
+export interface FacetValue {
+  value: string;
+  count: number;
+}
+
+export interface NFTFacets {
+  total: number;
+  facets: {
+    rarity: FacetValue[];
+    item_type: FacetValue[];
+    item_sub_type: FacetValue[];
+    material: FacetValue[];
+    source: FacetValue[];
+    collection: { value: number; slug: string; name: string; count: number }[];
+  };
+}
+
+export function fetchNFTFacets(params?: HttpParams) {
+  return getJson<NFTFacets>(`/nft/items/facets/`, params);
+}
+
 // GET /nft/items/?product_code=... (first result)
 export async function fetchNFTByProductCode(product_code: string): Promise<NFTItem | null> {
   const res = await getJson<Paginated<NFTItem>>(`/nft/items/`, { product_code, page_size: 1 });
   return (res.results && res.results.length > 0) ? res.results[0] : null;
 }
 
+// GET /nft/typeahead/?q=&limit= prefix suggestions for items and collections
+export interface TypeaheadEntry {
+  type: 'item' | 'collection';
+  id: number;
+  label: string;
+  name_pt_br?: string;
+  product_code?: string;
+  slug?: string;
+  image_url: string;
+}
+
+export function fetchTypeahead(q: string, limit?: number) {
+  return getJson<{ query: string; results: TypeaheadEntry[] }>(`/nft/typeahead/`, { q, limit });
+}
+
 // POST /nft/ to upsert a single item by product_code
 export function upsertNFTByProductCode(product_code: string) {
   return postJson<NFTItem>(`/nft/`, { product_code });
@@ -2,7 +2,7 @@ import { useEffect, useMemo, useState } from 'react';
 import { Button } from './ui/button';
 import { ImageWithFallback } from './figma/ImageWithFallback';
 import { ArrowLeft, Heart, Share2, ShoppingCart, MessageCircle, Info } from 'lucide-react';
-import { fetchImmutableItem, fetchImmutableListings, ImmutableItemView, ImmutableListingView, fetchImmutableAsset, metadataToAttributes } from '@/api/immutable';
+import { toItemView, fetchImmutableListings, ImmutableItemView, ImmutableListingView, fetchImmutableAsset, metadataToAttributes } from '@/api/immutable';
 import { Tabs, TabsContent } from './ui/tabs';
 import { Line, XAxis, YAxis, Tooltip, ResponsiveContainer, CartesianGrid, ComposedChart, Bar, Legend, Label, ReferenceLine } from 'recharts';
 import { upsertNFTByProductCode, fetchNFTByProductCode, recordNFTView } from '@/api/nft';
@@ -62,10 +62,14 @@ export function NFTItemPage({ slug, productCode, onBack }: NFTItemPageProps) {
         }
         if (!mounted) return;
 
-        // 2) Disparar buscas em paralelo
-  const itemPromise = fetchImmutableItem(productCode);
-  const listingsPromise = fetchImmutableListings(productCode);
-  const backendPromise = fetchNFTByProductCode(productCode).catch(() => null);
+        // 2) Disparar buscas em paralelo; o item vem do backend, que já precifica
+        //    a partir do livro de ofertas da Immutable (uma única requisição)
+        const backendPromise = fetchNFTByProductCode(productCode).catch(() => null);
+        const itemPromise = backendPromise.then(bi => {
+          if (!bi) throw new Error('Item não encontrado');
+          return toItemView(bi);
+        });
+        const listingsPromise = fetchImmutableListings(productCode);
 
         // 3) Renderizar o item assim que disponível (progressivo)
         let data: ImmutableItemView | null = null;
@@ -209,22 +213,6 @@ export function NFTItemPage({ slug, productCode, onBack }: NFTItemPageProps) {
     };
   }, [productCode]);
 
-  const immutableSearchUrl = useMemo(() => {
-    const params = new URLSearchParams({
-      status: 'active',
-      // usar os mesmos parâmetros base do backend
-      sell_metadata: JSON.stringify({ productCode: [productCode] }),
-      order_by: 'buy_quantity',
-      direction: 'asc',
-      page_size: '200',
-    });
-    return `https://api.x.immutable.com/v3/orders?${params.toString()}`;
-  }, [productCode]);
-
-  useEffect(() => {
-    // Debug logging removed; keep hook in case of future side-effects
-  }, [immutableSearchUrl]);
-
   const lowestListingBRL = useMemo(() => {
     const valid = listings.filter(l => typeof l.price_brl === 'number' && isFinite(l.price_brl) && l.price_brl > 0);
     if (!valid.length) return null;
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.response_cache import bump_model_version_on_commit
+
+from .models import NftCollection
+
+
+@receiver(post_save, sender=NftCollection)
+@receiver(post_delete, sender=NftCollection)
+def nftcollection_changed(sender, **kwargs):
+    bump_model_version_on_commit(NftCollection)
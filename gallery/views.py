@@ -4,6 +4,9 @@ from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from rest_framework.permissions import AllowAny
 
+from core.conditional import conditional_get
+from core.response_cache import cache_response
+
 from .models import NftCollection
 from .serializers import NftCollectionSerializer
 from .docs import (
@@ -26,6 +29,7 @@ class CollectionListCreateAPIView(APIView):
     serializer_class = NftCollectionSerializer
 
     @collection_list_schema
+    @cache_response(NftCollection)
     def get(self, request):
         """Lista todas as coleções NFT com suporte a busca."""
         q = request.query_params.get("q")
@@ -57,7 +61,11 @@ class CollectionDetailAPIView(APIView):
         """Retorna uma coleção pelo slug ou retorna 404."""
         return get_object_or_404(NftCollection, slug=slug)
 
+    def get_etag_queryset(self, request, slug):
+        return NftCollection.objects.filter(slug=slug)
+
     @collection_detail_schema
+    @conditional_get(NftCollection)
     def get(self, request, slug):
         """Retorna os detalhes completos de uma coleção NFT."""
         obj = self.get_object(slug)
@@ -70,6 +78,7 @@ class CollectionStatsAPIView(APIView):
     """
 
     @collection_stats_schema
+    @cache_response(NftCollection)
     def get(self, request):
         """Retorna estatísticas agregadas de todas as coleções."""
         from django.db.models import Sum, Avg
@@ -102,6 +111,7 @@ class CollectionTrendingAPIView(APIView):
     """
 
     @collection_trending_schema
+    @cache_response(NftCollection)
     def get(self, request):
         """Retorna as coleções trending ordenadas por volume total."""
         limit = int(request.query_params.get("limit", 10))
@@ -2,9 +2,21 @@ from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from nft.circuitbreaker import OPEN, get_circuit_states
+from nft.http_client import get_http_pool_stats
+
 
 class HealthCheckView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        return Response({"status": "ok"}, status=200)
+        circuits = get_circuit_states()
+        degraded = any(c.get("state") == OPEN for c in circuits.values())
+        return Response(
+            {
+                "status": "degraded" if degraded else "ok",
+                "circuit_breakers": circuits,
+                "http_pool": get_http_pool_stats(),
+            },
+            status=200,
+        )
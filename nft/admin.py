@@ -12,7 +12,7 @@ import io
 import os
 from django.conf import settings
 
-from .models import NFTItem, PricingConfig, NFTItemAccess
+from .models import NFTItem, PricingConfig, NFTItemAccess, ExchangeRate, NFTSale
 from gallery.models import NftCollection
 
 
@@ -782,3 +782,17 @@ class NFTItemAccessAdmin(admin.ModelAdmin):
     list_display = ("item", "accessed_at")
     list_filter = ("accessed_at",)
     search_fields = ("item__name", "item__product_code")
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ("pair", "rate", "updated_at")
+    readonly_fields = ("updated_at",)
+
+
+@admin.register(NFTSale)
+class NFTSaleAdmin(admin.ModelAdmin):
+    list_display = ("product_code", "sold_at", "price_brl", "order_id")
+    search_fields = ("product_code", "order_id")
+    list_filter = ("sold_at",)
+    readonly_fields = ("created_at",)
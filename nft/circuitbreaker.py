@@ -0,0 +1,147 @@
+"""Per-host circuit breaker for outbound calls, shared through the Django cache.
+
+A host's circuit opens when, within a counting window, at least `min_requests`
+calls were made and the share of failures (network errors and 5xx) reaches
+`failure_rate`. While open, calls fail fast with CircuitOpenError instead of
+burning retries. After `open_seconds` a single probe request is let through
+(half-open): success closes the circuit, failure re-opens it.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_TTL = 60 * 60 * 24
+
+
+def _config() -> Dict[str, Any]:
+    defaults = {
+        "failure_rate": 0.5,
+        "min_requests": 10,
+        "window_seconds": 60,
+        "open_seconds": 30,
+    }
+    return {**defaults, **getattr(settings, "CIRCUIT_BREAKER", {})}
+
+
+def _tracked(host: Optional[str]) -> bool:
+    return bool(host) and host in getattr(settings, "CIRCUIT_BREAKER_HOSTS", [])
+
+
+def _state_key(host: str) -> str:
+    return f"nft:cb:{host}:state"
+
+
+def _probe_key(host: str) -> str:
+    return f"nft:cb:{host}:probe"
+
+
+def _window_keys(host: str, window_seconds: int) -> tuple[str, str]:
+    window = int(time.time() // window_seconds)
+    return f"nft:cb:{host}:{window}:total", f"nft:cb:{host}:{window}:failures"
+
+
+def _open(host: str, cfg: Dict[str, Any]) -> None:
+    now = time.time()
+    cache.set(
+        _state_key(host),
+        {"opened_at": now, "open_until": now + cfg["open_seconds"]},
+        _STATE_TTL,
+    )
+    cache.delete(_probe_key(host))
+    logger.warning("Circuit breaker opened for %s for %ss", host, cfg["open_seconds"])
+
+
+def before_request(url: str) -> None:
+    """Raise CircuitOpenError when the URL's host circuit is open.
+    In half-open state only one caller across processes gets through as probe.
+    """
+    host = urlparse(url).hostname
+    if not _tracked(host):
+        return
+    try:
+        state = cache.get(_state_key(host))
+        if not state:
+            return
+        now = time.time()
+        if now < state["open_until"]:
+            raise CircuitOpenError(f"Circuito aberto para {host}")
+        if not cache.add(_probe_key(host), now, _config()["open_seconds"]):
+            raise CircuitOpenError(f"Circuito em teste (half-open) para {host}")
+    except CircuitOpenError:
+        raise
+    except Exception as e:  # noqa: BLE001 - fail open on cache errors
+        logger.debug("Circuit breaker unavailable for %s: %s", host, e)
+
+
+def record_result(url: str, ok: bool) -> None:
+    """Record the outcome of a request made after before_request() let it through."""
+    host = urlparse(url).hostname
+    if not _tracked(host):
+        return
+    cfg = _config()
+    try:
+        state = cache.get(_state_key(host))
+        if state:
+            if time.time() < state["open_until"]:
+                # Late result of a call started before the circuit opened
+                return
+            # Outcome of the half-open probe
+            if ok:
+                cache.delete_many([_state_key(host), _probe_key(host)])
+                cache.delete_many(list(_window_keys(host, cfg["window_seconds"])))
+                logger.info("Circuit breaker closed for %s", host)
+            else:
+                _open(host, cfg)
+            return
+
+        total_key, failures_key = _window_keys(host, cfg["window_seconds"])
+        ttl = int(cfg["window_seconds"]) * 2
+        cache.add(total_key, 0, ttl)
+        cache.add(failures_key, 0, ttl)
+        total = cache.incr(total_key)
+        if ok:
+            return
+        failures = cache.incr(failures_key)
+        if total >= cfg["min_requests"] and failures / total >= cfg["failure_rate"]:
+            _open(host, cfg)
+    except Exception as e:  # noqa: BLE001
+        logger.debug("Circuit breaker unavailable for %s: %s", host, e)
+
+
+def get_circuit_states() -> Dict[str, Dict[str, Any]]:
+    """Current breaker state per tracked host (for the health endpoint)."""
+    cfg = _config()
+    states: Dict[str, Dict[str, Any]] = {}
+    for host in getattr(settings, "CIRCUIT_BREAKER_HOSTS", []):
+        try:
+            state = cache.get(_state_key(host))
+            total_key, failures_key = _window_keys(host, cfg["window_seconds"])
+            counts = cache.get_many([total_key, failures_key])
+        except Exception:  # noqa: BLE001
+            states[host] = {"state": "unknown"}
+            continue
+        info: Dict[str, Any] = {
+            "state": CLOSED,
+            "requests": counts.get(total_key, 0),
+            "failures": counts.get(failures_key, 0),
+        }
+        if state:
+            info["state"] = OPEN if time.time() < state["open_until"] else HALF_OPEN
+            info["open_until"] = state["open_until"]
+        states[host] = info
+    return states
@@ -5,8 +5,14 @@ from drf_spectacular.utils import (
     OpenApiParameter,
 )
 
-from .serializers import FetchByProductCodeSerializer, NFTItemSerializer
-
+from .serializers import (
+    FetchByProductCodeSerializer,
+    NFTItemSerializer,
+    PricePointSerializer,
+    ListingSerializer,
+    TypeaheadEntrySerializer,
+    FacetCountsSerializer,
+)
 
 nft_item_upsert_schema = extend_schema(
     operation_id="nft_items_upsert",
@@ -82,8 +88,18 @@ nft_item_list_schema = extend_schema(
         "- collection_id (number)\n"
         "- collection_slug (string)\n"
         "Busca: "
-        "use o parâmetro 'search' para procurar por nome ou product_code.\n"
-        "Ordenação: use 'ordering', ex.: ordering=last_price_brl,-updated_at."
+        "use o parâmetro 'search' para procurar por nome ou product_code "
+        "(no PostgreSQL inclui prefixos e correspondência aproximada); com "
+        "search_mode=ranked os resultados vêm ordenados por relevância.\n"
+        "Ordenação: use 'ordering', ex.: ordering=last_price_brl,-updated_at.\n\n"
+        "Paginação por cursor (opcional, para scroll infinito): envie "
+        "pagination=cursor e siga a URL em 'next'. A resposta não traz 'count' e "
+        "o custo de cada página não cresce com a profundidade.\n\n"
+        "Projeção: 'fields' (lista separada por vírgulas, ex.: "
+        "fields=id,name,last_price_brl) e/ou profile=card (campos usados pelos cards "
+        "da grade) limitam o JSON e as colunas lidas do banco.\n\n"
+        "Cache condicional: a resposta traz ETag; reenvie-o em If-None-Match para "
+        "receber 304 sem corpo enquanto os itens filtrados não mudarem."
     ),
     parameters=[
         OpenApiParameter(name="rarity", type=str, location=OpenApiParameter.QUERY),
@@ -112,9 +128,29 @@ nft_item_list_schema = extend_schema(
             name="collection_slug", type=str, location=OpenApiParameter.QUERY
         ),
         OpenApiParameter(name="search", type=str, location=OpenApiParameter.QUERY),
+        OpenApiParameter(
+            name="search_mode",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            enum=["ranked"],
+        ),
         OpenApiParameter(name="ordering", type=str, location=OpenApiParameter.QUERY),
         OpenApiParameter(name="page", type=int, location=OpenApiParameter.QUERY),
         OpenApiParameter(name="page_size", type=int, location=OpenApiParameter.QUERY),
+        OpenApiParameter(
+            name="pagination",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            enum=["cursor"],
+        ),
+        OpenApiParameter(name="cursor", type=str, location=OpenApiParameter.QUERY),
+        OpenApiParameter(name="fields", type=str, location=OpenApiParameter.QUERY),
+        OpenApiParameter(
+            name="profile",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            enum=["card"],
+        ),
     ],
     responses={200: OpenApiResponse(response=NFTItemSerializer)},
     examples=[
@@ -141,3 +177,218 @@ nft_item_list_schema = extend_schema(
         )
     ],
 )
+
+
+nft_price_history_schema = extend_schema(
+    operation_id="nft_items_price_history",
+    tags=["nft"],
+    summary="Histórico de preços de um item",
+    description=(
+        "Retorna a série de preços (ETH/USD/BRL) de um product_code no intervalo "
+        "[start, end), do mais antigo para o mais recente. Padrão: últimos 7 dias.\n\n"
+        "Observações recentes são brutas; as mais antigas ficam agregadas por hora "
+        "e depois por dia. Use 'interval' para receber pontos médios por hora ou dia."
+    ),
+    parameters=[
+        OpenApiParameter(
+            name="start",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="ISO 8601",
+        ),
+        OpenApiParameter(
+            name="end",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="ISO 8601",
+        ),
+        OpenApiParameter(
+            name="interval",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            enum=["hour", "day"],
+        ),
+    ],
+    responses={
+        200: OpenApiResponse(
+            response=PricePointSerializer(many=True), description="Pontos da série"
+        ),
+        400: OpenApiResponse(description="Parâmetros inválidos"),
+        404: OpenApiResponse(description="Item não encontrado"),
+    },
+    examples=[
+        OpenApiExample(
+            "Exemplo de resposta",
+            value={
+                "product_code": "nft_cf25_leather",
+                "start": "2025-10-11T00:00:00Z",
+                "end": "2025-10-18T00:00:00Z",
+                "interval": "day",
+                "points": [
+                    {
+                        "t": "2025-10-17T00:00:00Z",
+                        "eth": "0.012345679",
+                        "usd": "23.45",
+                        "brl": "123.45",
+                    }
+                ],
+            },
+            response_only=True,
+        )
+    ],
+)
+
+
+nft_listings_schema = extend_schema(
+    operation_id="nft_items_listings",
+    tags=["nft"],
+    summary="Listagens ativas de um item",
+    description=(
+        "Retorna as ordens ativas da Immutable para o product_code, com preços em "
+        "ETH/USD/BRL já convertidos com markup, da mais barata para a mais cara.\n\n"
+        "Paginação por cursor: siga a URL em 'next'. A resposta traz ETag e "
+        "Cache-Control; envie If-None-Match para receber 304 quando nada mudou."
+    ),
+    parameters=[
+        OpenApiParameter(name="cursor", type=str, location=OpenApiParameter.QUERY),
+        OpenApiParameter(name="page_size", type=int, location=OpenApiParameter.QUERY),
+    ],
+    responses={
+        200: OpenApiResponse(
+            response=ListingSerializer(many=True), description="Página de listagens"
+        ),
+        304: OpenApiResponse(description="Não modificado (If-None-Match)"),
+        400: OpenApiResponse(description="Parâmetros inválidos"),
+        404: OpenApiResponse(description="Item não encontrado"),
+        502: OpenApiResponse(description="Falha ao consultar a Immutable"),
+    },
+    examples=[
+        OpenApiExample(
+            "Exemplo de resposta",
+            value={
+                "product_code": "nft_cf25_leather",
+                "next": "https://api.nftmarketplace.com.br/nft/items/nft_cf25_leather/listings/?cursor=WyIxMjMuNDUiLCAiMTIzNDUiXQ%3D%3D",
+                "results": [
+                    {
+                        "id": "12345",
+                        "price_eth": "0.012345678900000000",
+                        "price_usd": "23.45",
+                        "price_brl": "123.45",
+                        "quantity": 1,
+                        "expiration": "2025-12-31T23:59:59Z",
+                        "seller": "0xabc...",
+                        "token_address": "0xdef...",
+                        "token_id": "987",
+                    }
+                ],
+            },
+            response_only=True,
+        )
+    ],
+)
+
+
+nft_typeahead_schema = extend_schema(
+    operation_id="nft_typeahead",
+    tags=["nft"],
+    summary="Autocomplete de itens e coleções",
+    description=(
+        "Sugestões por prefixo sobre name, name_pt_br, product_code de itens e "
+        "nomes de coleções (sem diferenciar maiúsculas e acentos; vale o início "
+        "de qualquer palavra). Servido de um índice em memória, sem consultar o "
+        "banco; alterações aparecem em até NFT_TYPEAHEAD_SYNC_SECONDS."
+    ),
+    parameters=[
+        OpenApiParameter(
+            name="q", type=str, location=OpenApiParameter.QUERY, required=True
+        ),
+        OpenApiParameter(name="limit", type=int, location=OpenApiParameter.QUERY),
+    ],
+    responses={
+        200: OpenApiResponse(
+            response=TypeaheadEntrySerializer(many=True), description="Sugestões"
+        ),
+        400: OpenApiResponse(description="Parâmetros inválidos"),
+    },
+    examples=[
+        OpenApiExample(
+            "Exemplo de resposta",
+            value={
+                "query": "leat",
+                "results": [
+                    {
+                        "type": "item",
+                        "id": 1,
+                        "label": "Leather",
+                        "name_pt_br": "Couro",
+                        "product_code": "nft_cf25_leather",
+                        "image_url": "https://example.com/leather.png",
+                    }
+                ],
+            },
+            response_only=True,
+        )
+    ],
+)
+
+
+nft_item_facets_schema = extend_schema(
+    operation_id="nft_items_facets",
+    tags=["nft"],
+    summary="Contagens dos filtros do catálogo",
+    description=(
+        "Aceita os mesmos filtros e busca de /nft/items/ e retorna, para cada "
+        "filtro (rarity, item_type, item_sub_type, material, source, collection), "
+        "quantos itens existem por valor.\n\n"
+        "A contagem de um filtro ignora o valor selecionado nele mesmo, mas "
+        "respeita todos os outros, para que as alternativas continuem visíveis na "
+        "barra lateral. 'total' é o número de itens com todos os filtros aplicados."
+    ),
+    parameters=[
+        OpenApiParameter(name="rarity", type=str, location=OpenApiParameter.QUERY),
+        OpenApiParameter(name="item_type", type=str, location=OpenApiParameter.QUERY),
+        OpenApiParameter(
+            name="item_sub_type", type=str, location=OpenApiParameter.QUERY
+        ),
+        OpenApiParameter(name="material", type=str, location=OpenApiParameter.QUERY),
+        OpenApiParameter(name="source", type=str, location=OpenApiParameter.QUERY),
+        OpenApiParameter(
+            name="collection_id", type=int, location=OpenApiParameter.QUERY
+        ),
+        OpenApiParameter(
+            name="collection_slug", type=str, location=OpenApiParameter.QUERY
+        ),
+        OpenApiParameter(name="search", type=str, location=OpenApiParameter.QUERY),
+    ],
+    responses={
+        200: OpenApiResponse(response=FacetCountsSerializer),
+        400: OpenApiResponse(description="Parâmetros inválidos"),
+    },
+    examples=[
+        OpenApiExample(
+            "Exemplo de resposta",
+            value={
+                "total": 2,
+                "facets": {
+                    "rarity": [
+                        {"value": "Common", "count": 2},
+                        {"value": "Rare", "count": 1},
+                    ],
+                    "item_type": [{"value": "Material", "count": 2}],
+                    "item_sub_type": [],
+                    "material": [],
+                    "source": [],
+                    "collection": [
+                        {
+                            "value": 1,
+                            "slug": "cidade-alta",
+                            "name": "Cidade Alta",
+                            "count": 2,
+                        }
+                    ],
+                },
+            },
+            response_only=True,
+        )
+    ],
+)
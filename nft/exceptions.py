@@ -0,0 +1,14 @@
+class ImmutableAPIError(Exception):
+    """Raised when Immutable API returns a non-success status code."""
+
+
+class CircuitOpenError(ImmutableAPIError):
+    """Raised without calling upstream while the host's circuit breaker is open."""
+
+
+class IncompletePaginationError(ImmutableAPIError):
+    """Raised when a paginated query stopped before its last page."""
+
+
+class RateLimitTimeout(ImmutableAPIError):
+    """Raised when no token of the host's shared rate budget became available in time."""
@@ -0,0 +1,106 @@
+"""Facet counts for the NFT catalog filters.
+
+Counts are disjunctive, as sidebars expect: the counts of a facet ignore that
+facet's own selection, so the alternatives stay visible, but respect every
+other filter. All facets come from a single grouped query. The queryset
+arrives filtered by everything except the facet params, is grouped by the
+facet columns together, and the per-facet counts are then folded in Python
+from the combination rows.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from django.db.models import Count
+
+# Facet name -> NFTItemFilter param / model field (iexact filters)
+TEXT_FACETS = ("rarity", "item_type", "item_sub_type", "material", "source")
+COLLECTION_FACET = "collection"
+COLLECTION_PARAMS = ("collection_id", "collection_slug")
+FACET_PARAMS = TEXT_FACETS + COLLECTION_PARAMS
+
+
+def _selected(params) -> Dict[str, Any]:
+    selected: Dict[str, Any] = {}
+    for name in TEXT_FACETS:
+        value = (params.get(name) or "").strip()
+        if value:
+            selected[name] = value.casefold()
+    collection_id = (params.get("collection_id") or "").strip()
+    collection_slug = (params.get("collection_slug") or "").strip()
+    if collection_id or collection_slug:
+        selected[COLLECTION_FACET] = (collection_id, collection_slug.casefold())
+    return selected
+
+
+def _matches(row: Dict[str, Any], name: str, wanted: Any) -> bool:
+    if name == COLLECTION_FACET:
+        collection_id, slug = wanted
+        if collection_id and str(row["collection_id"]) != collection_id:
+            return False
+        return not slug or (row["collection__slug"] or "").casefold() == slug
+    return (row[name] or "").casefold() == wanted
+
+
+def facet_counts(queryset, params) -> Dict[str, Any]:
+    """Counts per value of every facet. queryset must already be filtered by
+    every non-facet param; the facet selections are read from params.
+    """
+    selected = _selected(params)
+    rows = (
+        queryset.order_by()
+        .values(*TEXT_FACETS, "collection_id", "collection__slug", "collection__name")
+        .annotate(n=Count("pk"))
+    )
+
+    text_counts: Dict[str, Dict[str, List[Any]]] = {name: {} for name in TEXT_FACETS}
+    collection_counts: Dict[int, Dict[str, Any]] = {}
+    total = 0
+    for row in rows:
+        failed = [
+            name for name, wanted in selected.items() if not _matches(row, name, wanted)
+        ]
+        if not failed:
+            total += row["n"]
+        # A row counts for a facet when only that facet's own selection rejects it
+        for name in TEXT_FACETS:
+            if failed and failed != [name]:
+                continue
+            value = row[name] or ""
+            if not value:
+                continue
+            # Filters are iexact, so values differing only in case are one option
+            entry = text_counts[name].setdefault(value.casefold(), [value, 0])
+            entry[1] += row["n"]
+        if (not failed or failed == [COLLECTION_FACET]) and row["collection_id"]:
+            entry = collection_counts.setdefault(
+                row["collection_id"],
+                {
+                    "value": row["collection_id"],
+                    "slug": row["collection__slug"],
+                    "name": row["collection__name"],
+                    "count": 0,
+                },
+            )
+            entry["count"] += row["n"]
+
+    facets: Dict[str, List[Dict[str, Any]]] = {
+        name: sorted(
+            ({"value": value, "count": count} for value, count in counts.values()),
+            key=lambda f: (-f["count"], f["value"]),
+        )
+        for name, counts in text_counts.items()
+    }
+    facets[COLLECTION_FACET] = sorted(
+        collection_counts.values(), key=lambda f: (-f["count"], f["name"] or "")
+    )
+    return {"total": total, "facets": facets}
+
+
+def strip_facet_params(params):
+    """Copy of the query params without the facet selections."""
+    data = params.copy()
+    for name in FACET_PARAMS:
+        data.pop(name, None)
+    return data
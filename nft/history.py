@@ -0,0 +1,185 @@
+"""Append-only price history with integer-scaled storage and downsampling.
+
+Every price write appends a raw NFTPriceObservation. rollup_price_history folds
+raw rows older than NFT_PRICE_HISTORY["raw_days"] into hourly buckets and hourly
+rows older than ["hourly_days"] into daily buckets, so each item keeps a bounded
+number of rows while the series stays continuous: a time slot is stored at
+exactly one resolution.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import NFTPriceObservation
+
+logger = logging.getLogger(__name__)
+
+ETH_SCALE = 10**9  # gwei
+FIAT_SCALE = 100  # cents
+
+_PRICE_COLUMNS = {
+    "price_eth_gwei": ("last_price_eth", ETH_SCALE),
+    "price_usd_cents": ("last_price_usd", FIAT_SCALE),
+    "price_brl_cents": ("last_price_brl", FIAT_SCALE),
+}
+
+
+def _retention() -> Tuple[timedelta, timedelta]:
+    cfg = getattr(settings, "NFT_PRICE_HISTORY", {})
+    return (
+        timedelta(days=cfg.get("raw_days", 7)),
+        timedelta(days=cfg.get("hourly_days", 90)),
+    )
+
+
+def to_scaled(value: Any, scale: int) -> int:
+    return int((Decimal(value or 0) * scale).to_integral_value(ROUND_HALF_UP))
+
+
+def from_scaled(value: int, scale: int) -> Decimal:
+    return Decimal(value) / scale
+
+
+def record_price_observations(
+    rows: Iterable[Tuple[int, Dict[str, Any]]],
+    observed_at: Optional[datetime] = None,
+) -> int:
+    """Append one raw observation per (item_id, fields) pair, where fields holds
+    last_price_eth/usd/brl. Returns the number of rows inserted.
+    """
+    observed_at = observed_at or timezone.now()
+    objs = [
+        NFTPriceObservation(
+            item_id=item_id,
+            observed_at=observed_at,
+            **{
+                column: to_scaled(values.get(field), scale)
+                for column, (field, scale) in _PRICE_COLUMNS.items()
+            },
+        )
+        for item_id, values in rows
+    ]
+    NFTPriceObservation.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+def _weighted_buckets(qs, kind: str):
+    """Group qs into `kind` buckets (UTC) with sample-weighted price sums."""
+    return (
+        qs.annotate(bucket=Trunc("observed_at", kind, tzinfo=dt_timezone.utc))
+        .values("item_id", "bucket")
+        .annotate(
+            n=Sum("samples"),
+            **{column: Sum(F(column) * F("samples")) for column in _PRICE_COLUMNS},
+        )
+        .order_by("item_id", "bucket")
+    )
+
+
+def _rollup(source: int, target: int, kind: str, cutoff: datetime) -> int:
+    src = NFTPriceObservation.objects.filter(resolution=source, observed_at__lt=cutoff)
+    created = 0
+    with transaction.atomic():
+        batch: List[NFTPriceObservation] = []
+        for row in _weighted_buckets(src, kind).iterator(chunk_size=2000):
+            n = row["n"]
+            batch.append(
+                NFTPriceObservation(
+                    item_id=row["item_id"],
+                    observed_at=row["bucket"],
+                    resolution=target,
+                    samples=n,
+                    **{
+                        column: int(
+                            (Decimal(row[column]) / n).to_integral_value(ROUND_HALF_UP)
+                        )
+                        for column in _PRICE_COLUMNS
+                    },
+                )
+            )
+            if len(batch) >= 1000:
+                NFTPriceObservation.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            NFTPriceObservation.objects.bulk_create(batch)
+            created += len(batch)
+        src.delete()
+    return created
+
+
+def rollup_price_history(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Downsample aged observations: raw -> hourly -> daily.
+
+    Cutoffs are aligned to bucket boundaries so a bucket is always built from
+    all of its source rows in a single run.
+    """
+    now = now or timezone.now()
+    raw_keep, hourly_keep = _retention()
+    hour_cutoff = (now - raw_keep).astimezone(dt_timezone.utc)
+    hour_cutoff = hour_cutoff.replace(minute=0, second=0, microsecond=0)
+    day_cutoff = (now - hourly_keep).astimezone(dt_timezone.utc)
+    day_cutoff = day_cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "hourly": _rollup(
+            NFTPriceObservation.RAW, NFTPriceObservation.HOUR, "hour", hour_cutoff
+        ),
+        "daily": _rollup(
+            NFTPriceObservation.HOUR, NFTPriceObservation.DAY, "day", day_cutoff
+        ),
+    }
+
+
+def _point(observed_at: datetime, eth: int, usd: int, brl: int) -> Dict[str, Any]:
+    return {
+        "t": observed_at,
+        "eth": from_scaled(eth, ETH_SCALE),
+        "usd": from_scaled(usd, FIAT_SCALE),
+        "brl": from_scaled(brl, FIAT_SCALE),
+    }
+
+
+def price_history(
+    item_id: int,
+    start: datetime,
+    end: datetime,
+    interval: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Chart points for item_id in [start, end), oldest first.
+
+    Without interval every stored row is returned (density follows the stored
+    resolution); with interval="hour" or "day" rows are averaged per bucket.
+    """
+    qs = NFTPriceObservation.objects.filter(
+        item_id=item_id, observed_at__gte=start, observed_at__lt=end
+    )
+    if interval is None:
+        rows = qs.order_by("observed_at").values_list(
+            "observed_at", *_PRICE_COLUMNS.keys()
+        )
+        return [_point(*row) for row in rows]
+
+    points = []
+    for row in _weighted_buckets(qs, interval):
+        n = row["n"]
+        points.append(
+            _point(
+                row["bucket"],
+                *(
+                    int((Decimal(row[c]) / n).to_integral_value(ROUND_HALF_UP))
+                    for c in _PRICE_COLUMNS
+                ),
+            )
+        )
+    return points
@@ -0,0 +1,106 @@
+"""Shared keep-alive HTTP session for outbound calls (Immutable, CoinGecko, AwesomeAPI).
+
+Every request made through it is guarded by nft.circuitbreaker and throttled
+by nft.ratelimit.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from . import circuitbreaker
+from .ratelimit import acquire_for_url
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+class _GuardedSession(requests.Session):
+    """Session that checks the host's circuit breaker and takes a token from its
+    shared rate budget before each request, then records the outcome."""
+
+    def request(self, method, url, *args, **kwargs):
+        url = str(url)
+        circuitbreaker.before_request(url)
+        acquire_for_url(url)
+        try:
+            resp = super().request(method, url, *args, **kwargs)
+        except Exception:
+            circuitbreaker.record_result(url, ok=False)
+            raise
+        circuitbreaker.record_result(url, ok=resp.status_code < 500)
+        return resp
+
+
+def _build_session() -> requests.Session:
+    """Create a Session whose adapter keeps a bounded connection pool per host."""
+    adapter = HTTPAdapter(
+        # Number of distinct hosts kept in the pool manager
+        pool_connections=getattr(settings, "HTTP_POOL_CONNECTIONS", 10),
+        # Max open connections per host
+        pool_maxsize=getattr(settings, "HTTP_POOL_MAXSIZE", 10),
+        # Wait for a free connection instead of opening extra ones above the limit
+        pool_block=getattr(settings, "HTTP_POOL_BLOCK", True),
+        # Retries are handled by the callers (see services._get_json_with_retries)
+        max_retries=0,
+    )
+    session = _GuardedSession()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {"Accept": "application/json", "User-Agent": "nft-portal/1.0"}
+    )
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled Session.
+
+    The underlying urllib3 pools are thread-safe, so Celery worker threads share it.
+    A new Session is built after fork (gunicorn/Celery prefork), so sockets are
+    never shared between processes.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+def get_http_pool_stats() -> Dict[str, Dict[str, int]]:
+    """Connection reuse counters per host for the current process.
+
+    `requests` is the number of requests sent, `connections` the number of
+    TCP/TLS connections opened; the difference is what keep-alive saved.
+    """
+    session = _session
+    if session is None or _session_pid != os.getpid():
+        return {}
+    stats: Dict[str, Dict[str, int]] = {}
+    for adapter in set(session.adapters.values()):
+        pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+        if pools is None:
+            continue
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{key.key_scheme}://{key.key_host}"
+            requests_sent = int(getattr(pool, "num_requests", 0))
+            opened = int(getattr(pool, "num_connections", 0))
+            stats[host] = {
+                "requests": requests_sent,
+                "connections": opened,
+                "reused": max(requests_sent - opened, 0),
+            }
+    return stats
@@ -1,5 +1,13 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from nft.tasks import update_all_nft_prices_nightly, update_nft_price
+from django.db.models import Avg, Max, Min
+from nft.scheduler import due_count, refresh_budget
+from nft.tasks import (
+    recompute_nft_refresh_intervals,
+    schedule_nft_refreshes,
+    update_all_nft_prices_nightly,
+    update_nft_price,
+)
 from nft.models import NFTItem
 
 
@@ -9,7 +17,14 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument(
             "action",
-            choices=["status", "run-now", "run-single", "test"],
+            choices=[
+                "status",
+                "run-now",
+                "run-single",
+                "schedule",
+                "recompute",
+                "test",
+            ],
             help="Ação a ser executada",
         )
         parser.add_argument(
@@ -35,6 +50,10 @@ class Command(BaseCommand):
                 )
                 return
             self.run_single(product_code)
+        elif action == "schedule":
+            self.schedule()
+        elif action == "recompute":
+            self.recompute()
         elif action == "test":
             self.test_system()
 
@@ -67,13 +86,38 @@ class Command(BaseCommand):
             price_str = f"R$ {price}" if price else "N/A"
             self.stdout.write(f"  • {product_code}: {name} - {price_str}")
 
-        self.stdout.write("\nPróxima execução agendada: Todo dia às 1h00")
-        self.stdout.write("Intervalo entre atualizações: 6 segundos por produto")
+        chunk_size = getattr(settings, "NFT_REFRESH_CHUNK_SIZE", 25)
+        immutable_limit = getattr(settings, "UPSTREAM_RATE_LIMITS", {}).get(
+            "api.x.immutable.com", {}
+        )
+        self.stdout.write("\nAgendador adaptativo: a cada minuto")
+        self.stdout.write(f"Produtos com atualização vencida: {due_count()}")
+        self.stdout.write(f"Orçamento por tick: {refresh_budget()} produtos")
+        intervals = NFTItem.objects.aggregate(
+            min=Min("refresh_interval_seconds"),
+            avg=Avg("refresh_interval_seconds"),
+            max=Max("refresh_interval_seconds"),
+        )
+        if intervals["avg"] is not None:
+            self.stdout.write(
+                "Intervalo de atualização (min/médio/max): "
+                f"{intervals['min'] / 60:.0f} / {intervals['avg'] / 60:.0f} / "
+                f"{intervals['max'] / 60:.0f} minutos"
+            )
+        self.stdout.write(f"Produtos por lote: {chunk_size}")
+        if immutable_limit:
+            self.stdout.write(
+                "Limite de requisições à Immutable: "
+                f"{immutable_limit['rate']} a cada {immutable_limit['period']}s"
+            )
 
-        if products_with_code > 0:
-            estimated_duration = products_with_code * 6 / 60
+        if products_with_code > 0 and immutable_limit:
+            # Ao menos uma requisição por lote, no ritmo do rate limiter
+            chunks = -(-products_with_code // chunk_size)
+            per_second = immutable_limit["rate"] / immutable_limit["period"]
+            estimated_duration = chunks / per_second / 60
             self.stdout.write(
-                f"Duração estimada da rotina: {estimated_duration:.1f} minutos"
+                f"Duração mínima estimada da rotina completa: {estimated_duration:.1f} minutos"
             )
 
     def run_now(self):
@@ -109,6 +153,37 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"Erro ao atualizar o produto: {e}"))
 
+    def schedule(self):
+        """Executa um tick do agendador adaptativo imediatamente."""
+        result = schedule_nft_refreshes()
+        if result.get("status") == "success":
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{result['scheduled_items']} produtos enviados para atualização "
+                    f"(orçamento {result['budget']})"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.ERROR(f"Erro no agendador: {result.get('error')}")
+            )
+
+    def recompute(self):
+        """Recalcula os intervalos de atualização imediatamente."""
+        result = recompute_nft_refresh_intervals()
+        if result.get("status") == "success":
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Intervalos recalculados: {result['changed']} itens"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Erro ao recalcular intervalos: {result.get('error')}"
+                )
+            )
+
     def test_system(self):
         """Testa o sistema com um produto de exemplo."""
         self.stdout.write("Testando sistema de atualização...")
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nft", "0006_add_name_pt_br"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExchangeRate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("pair", models.CharField(max_length=16, unique=True)),
+                ("rate", models.DecimalField(decimal_places=8, max_digits=20)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Cotação",
+                "verbose_name_plural": "Cotações",
+            },
+        ),
+    ]
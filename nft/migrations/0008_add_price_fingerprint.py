@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nft", "0007_exchangerate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="nftitem",
+            name="price_fingerprint",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
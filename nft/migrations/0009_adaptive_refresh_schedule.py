@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nft", "0008_add_price_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="nftitem",
+            name="next_refresh_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="nftitem",
+            name="price_volatility",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="nftitem",
+            name="refresh_interval_seconds",
+            field=models.PositiveIntegerField(default=86400),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nft", "0009_adaptive_refresh_schedule"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="nftitem",
+            name="sales_synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="NFTSale",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("order_id", models.CharField(max_length=64, unique=True)),
+                ("product_code", models.CharField(db_index=True, max_length=120)),
+                ("sold_at", models.DateTimeField()),
+                ("price_eth", models.DecimalField(decimal_places=18, max_digits=38)),
+                ("price_usd", models.DecimalField(decimal_places=2, max_digits=18)),
+                ("price_brl", models.DecimalField(decimal_places=2, max_digits=18)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Venda",
+                "verbose_name_plural": "Vendas",
+                "indexes": [
+                    models.Index(
+                        fields=["product_code", "sold_at"],
+                        name="nft_nftsale_product_3508a6_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nft", "0010_nftsale_ledger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NFTPriceObservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("observed_at", models.DateTimeField()),
+                (
+                    "resolution",
+                    models.PositiveSmallIntegerField(
+                        choices=[(0, "Bruto"), (1, "Hora"), (2, "Dia")], default=0
+                    ),
+                ),
+                ("price_eth_gwei", models.BigIntegerField()),
+                ("price_usd_cents", models.BigIntegerField()),
+                ("price_brl_cents", models.BigIntegerField()),
+                ("samples", models.PositiveIntegerField(default=1)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_observations",
+                        to="nft.nftitem",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Observação de preço",
+                "verbose_name_plural": "Histórico de preços",
+                "indexes": [
+                    models.Index(
+                        fields=["item", "observed_at", "resolution"],
+                        include=(
+                            "price_eth_gwei",
+                            "price_usd_cents",
+                            "price_brl_cents",
+                            "samples",
+                        ),
+                        name="nft_price_obs_item_time_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+"""PostgreSQL search index for NFTItem (see nft.search).
+
+Adds a trigger-maintained tsvector column (English, Portuguese and unstemmed
+tokens) with a GIN index, plus pg_trgm GIN indexes on UPPER(name),
+UPPER(name_pt_br) and UPPER(product_code), which serve both the icontains
+fallback and fuzzy word-similarity matches. Other databases are left untouched:
+search there keeps using plain icontains.
+"""
+
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('pg_catalog.english', coalesce({row}name, '')), 'A')
+    || setweight(to_tsvector('pg_catalog.portuguese', coalesce({row}name_pt_br, '')), 'A')
+    || setweight(to_tsvector('pg_catalog.simple', coalesce({row}product_code, '')), 'B')
+    || setweight(to_tsvector('pg_catalog.simple',
+        coalesce({row}name, '') || ' ' || coalesce({row}name_pt_br, '')), 'C')
+"""
+
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE nft_nftitem ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION nft_nftitem_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := %s;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """ % SEARCH_VECTOR_SQL.format(row="NEW."),
+    """
+    CREATE TRIGGER nft_nftitem_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, name_pt_br, product_code ON nft_nftitem
+    FOR EACH ROW EXECUTE FUNCTION nft_nftitem_search_vector_update()
+    """,
+    "UPDATE nft_nftitem SET search_vector = %s" % SEARCH_VECTOR_SQL.format(row=""),
+    "CREATE INDEX nft_item_search_vector_idx ON nft_nftitem USING gin (search_vector)",
+    "CREATE INDEX nft_item_name_trgm_idx ON nft_nftitem "
+    "USING gin (upper(name) gin_trgm_ops)",
+    "CREATE INDEX nft_item_name_pt_br_trgm_idx ON nft_nftitem "
+    "USING gin (upper(name_pt_br) gin_trgm_ops)",
+    "CREATE INDEX nft_item_product_code_trgm_idx ON nft_nftitem "
+    "USING gin (upper(product_code) gin_trgm_ops)",
+]
+
+BACKWARD_SQL = [
+    "DROP INDEX IF EXISTS nft_item_product_code_trgm_idx",
+    "DROP INDEX IF EXISTS nft_item_name_pt_br_trgm_idx",
+    "DROP INDEX IF EXISTS nft_item_name_trgm_idx",
+    "DROP INDEX IF EXISTS nft_item_search_vector_idx",
+    "DROP TRIGGER IF EXISTS nft_nftitem_search_vector_trigger ON nft_nftitem",
+    "DROP FUNCTION IF EXISTS nft_nftitem_search_vector_update()",
+    "ALTER TABLE nft_nftitem DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nft", "0011_price_history"),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(BACKWARD_SQL)),
+    ]
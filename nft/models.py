@@ -65,6 +65,19 @@ class NFTItem(models.Model):
         max_digits=7, decimal_places=2, blank=True, null=True, default=0
     )
     seven_day_updated_at = models.DateTimeField(blank=True, null=True)
+    # High-water mark of the NFTSale ledger: filled orders up to this instant are stored
+    sales_synced_at = models.DateTimeField(blank=True, null=True)
+
+    # Hash of the last refreshed Immutable data (mapped fields + best order id);
+    # refreshes whose fingerprint matches only store price_volatility
+    price_fingerprint = models.CharField(max_length=64, blank=True, default="")
+
+    # Adaptive refresh scheduling (nft.scheduler): items are refreshed when
+    # next_refresh_at is due, every refresh_interval_seconds
+    refresh_interval_seconds = models.PositiveIntegerField(default=86400)
+    next_refresh_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    # EWMA of the relative change of last_price_eth between refreshes
+    price_volatility = models.FloatField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -80,6 +93,8 @@ class NFTItem(models.Model):
             models.Index(fields=["name"]),
             models.Index(fields=["product_code"]),
         ]
+        # PostgreSQL also has a trigger-maintained search_vector column and
+        # full-text/trigram GIN indexes (migration 0012, used by nft.search)
         ordering = ["name", "rarity", "item_type", "item_sub_type"]
 
     def __str__(self) -> str:  # type: ignore[override]
@@ -119,3 +134,96 @@ class PricingConfig(models.Model):
 
     def __str__(self) -> str:  # type: ignore[override]
         return f"Markup Global: {self.global_markup_percent}%"
+
+
+class ExchangeRate(models.Model):
+    """Última cotação conhecida (last-known-good) por par de moedas."""
+
+    pair = models.CharField(max_length=16, unique=True)
+    rate = models.DecimalField(max_digits=20, decimal_places=8)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Cotação"
+        verbose_name_plural = "Cotações"
+
+    def __str__(self) -> str:  # type: ignore[override]
+        return f"{self.pair}: {self.rate}"
+
+
+class NFTSale(models.Model):
+    """Venda (ordem filled) da Immutable, gravada uma única vez por order_id.
+
+    Keyed by product_code rather than a FK: sales are ingested before the item
+    exists when a product is registered for the first time.
+    """
+
+    order_id = models.CharField(max_length=64, unique=True)
+    product_code = models.CharField(max_length=120, db_index=True)
+    sold_at = models.DateTimeField()
+    # Converted at ingestion time with the FX rates and markup then in effect
+    price_eth = models.DecimalField(max_digits=38, decimal_places=18)
+    price_usd = models.DecimalField(max_digits=18, decimal_places=2)
+    price_brl = models.DecimalField(max_digits=18, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Venda"
+        verbose_name_plural = "Vendas"
+        indexes = [
+            models.Index(fields=["product_code", "sold_at"]),
+        ]
+
+    def __str__(self) -> str:  # type: ignore[override]
+        return f"{self.product_code} @ {self.sold_at}: R$ {self.price_brl}"
+
+
+class NFTPriceObservation(models.Model):
+    """Histórico de preços (append-only) de um item, para gráficos.
+
+    Prices are stored as integers (ETH in gwei, USD/BRL in cents) to keep rows
+    narrow. Raw observations are rolled up into hourly and then daily buckets by
+    nft.history.rollup_price_history; rolled rows hold the sample-weighted average.
+    """
+
+    RAW = 0
+    HOUR = 1
+    DAY = 2
+    RESOLUTION_CHOICES = [
+        (RAW, "Bruto"),
+        (HOUR, "Hora"),
+        (DAY, "Dia"),
+    ]
+
+    # Covered by the composite index below, which starts with item
+    item = models.ForeignKey(
+        NFTItem,
+        on_delete=models.CASCADE,
+        related_name="price_observations",
+        db_index=False,
+    )
+    observed_at = models.DateTimeField()  # bucket start for rolled-up rows
+    resolution = models.PositiveSmallIntegerField(
+        choices=RESOLUTION_CHOICES, default=RAW
+    )
+    price_eth_gwei = models.BigIntegerField()
+    price_usd_cents = models.BigIntegerField()
+    price_brl_cents = models.BigIntegerField()
+    samples = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Observação de preço"
+        verbose_name_plural = "Histórico de preços"
+        indexes = [
+            # Includes the value columns so chart range scans are index-only on PostgreSQL
+            models.Index(
+                fields=["item", "observed_at", "resolution"],
+                include=[
+                    "price_eth_gwei",
+                    "price_usd_cents",
+                    "price_brl_cents",
+                    "samples",
+                ],
+                name="nft_price_obs_item_time_idx",
+            ),
+        ]
@@ -0,0 +1,132 @@
+"""Short-lived shared cache of raw Immutable order pages.
+
+Paginated order queries that reached their last page are cached under a hash of
+their query params (product codes, status, ordering, filters) for
+IMMUTABLE_ORDERBOOK_CACHE_TTL seconds, zlib-compressed in the Django cache
+(Redis in production); truncated paginations are never stored. Concurrent
+misses for the same params are coalesced: one caller fetches while the others,
+in this process or in other workers, wait for its result instead of hitting
+Immutable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "nft:orders"
+# How long a fetch may hold the cross-process lock, and how long others wait for it
+_LOCK_TIMEOUT = 60
+_COALESCE_WAIT_SECONDS = 30.0
+_POLL_SECONDS = 0.1
+# Striped in-process locks: bounded memory, same key always maps to the same lock
+_LOCAL_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "IMMUTABLE_ORDERBOOK_CACHE_TTL", 30))
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    raw = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{_KEY_PREFIX}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+def get(params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Cached orders for params, or None on a miss (or when the cache is down)."""
+    try:
+        blob = cache.get(cache_key(params))
+    except Exception as e:
+        logger.warning("orderbook cache read failed: %s", e)
+        return None
+    if blob is None:
+        return None
+    try:
+        return json.loads(zlib.decompress(blob))
+    except (zlib.error, ValueError) as e:
+        logger.warning("orderbook cache entry unreadable: %s", e)
+        return None
+
+
+def store(
+    params: Dict[str, Any], orders: List[Dict[str, Any]], ttl: Optional[int] = None
+) -> None:
+    ttl = _ttl() if ttl is None else ttl
+    if ttl <= 0:
+        return
+    blob = zlib.compress(json.dumps(orders, separators=(",", ":")).encode("utf-8"))
+    try:
+        cache.set(cache_key(params), blob, ttl)
+    except Exception as e:
+        logger.warning("orderbook cache write failed: %s", e)
+
+
+def get_or_fetch(
+    params: Dict[str, Any],
+    fetch: Callable[[], Tuple[List[Dict[str, Any]], bool]],
+    ttl: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Return (orders, complete) for params, calling fetch() at most once per TTL.
+
+    fetch() returns (orders, complete), complete being True only when the
+    pagination reached its last page. Only complete results are cached; an
+    incomplete one is handed to this caller alone, so the next caller fetches
+    again. Cached entries are always complete. Exceptions from fetch()
+    propagate and nothing is cached.
+    """
+    ttl = _ttl() if ttl is None else ttl
+    if ttl <= 0:
+        return fetch()
+
+    cached = get(params)
+    if cached is not None:
+        return cached, True
+
+    key = cache_key(params)
+    lock_key = f"{key}:lock"
+    with _LOCAL_LOCKS[hash(key) % len(_LOCAL_LOCKS)]:
+        # Another thread may have filled the entry while we waited for the lock
+        cached = get(params)
+        if cached is not None:
+            return cached, True
+
+        try:
+            leader = cache.add(lock_key, 1, _LOCK_TIMEOUT)
+        except Exception:
+            leader = True
+        if not leader:
+            deadline = time.monotonic() + _COALESCE_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(_POLL_SECONDS)
+                cached = get(params)
+                if cached is not None:
+                    return cached, True
+                try:
+                    if cache.get(lock_key) is None:
+                        # The other fetch failed or was incomplete; take over
+                        break
+                except Exception:
+                    break
+            logger.info("orderbook cache: coalesced fetch not ready, fetching")
+
+        try:
+            orders, complete = fetch()
+            if complete:
+                store(params, orders, ttl)
+            return orders, complete
+        finally:
+            if leader:
+                try:
+                    cache.delete(lock_key)
+                except Exception:
+                    pass
@@ -0,0 +1,140 @@
+"""Keyset (cursor) pagination for NFT listings.
+
+Opt-in alternative to the default PageNumberPagination: pages are selected with
+a WHERE on the last row's ordering values instead of OFFSET, and no COUNT(*) is
+run, so page 500 costs the same as page 1. The requested ordering (OrderingFilter
+or the model default) gets the primary key appended as a unique tiebreaker, and
+NULLs always sort last so nullable fields such as last_price_brl keep a total order.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    invalid_cursor_message = "Cursor inválido"
+
+    def get_page_size(self, request) -> int:
+        default = api_settings.PAGE_SIZE or 50
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request, queryset, view) -> List[str]:
+        ordering = None
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = list(ordering or queryset.model._meta.ordering or [])
+        ordering = [o for o in ordering if o.lstrip("-") not in ("pk", "id")]
+        return ordering + ["pk"]
+
+    def _encode_cursor(self, ordering: List[str], values: List[Any]) -> str:
+        raw = json.dumps([ordering, values], default=str)
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    def _decode_cursor(self, request, ordering: List[str]) -> Optional[List[Any]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor_ordering, values = json.loads(
+                base64.urlsafe_b64decode(encoded.encode("ascii"))
+            )
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor is only meaningful for the ordering it was issued with
+        if cursor_ordering != ordering or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def _split(term: str) -> Tuple[str, bool]:
+        return term.lstrip("-"), term.startswith("-")
+
+    def _after(self, model, ordering: List[str], values: List[Any]) -> Q:
+        """Rows strictly after `values` in `ordering` (NULLs last in both directions)."""
+        pk_name = model._meta.pk.name
+        condition = Q(**{f"{pk_name}__gt": model._meta.pk.to_python(values[-1])})
+        for term, raw in reversed(list(zip(ordering[:-1], values[:-1]))):
+            name, desc = self._split(term)
+            field = model._meta.get_field(name)
+            if raw is None:
+                condition = Q(**{f"{name}__isnull": True}) & condition
+                continue
+            value = field.to_python(raw)
+            after = Q(**{f"{name}__{'lt' if desc else 'gt'}": value})
+            if field.null:
+                after |= Q(**{f"{name}__isnull": True})
+            condition = after | (Q(**{name: value}) & condition)
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        order_by = []
+        for term in self.ordering:
+            name, desc = self._split(term)
+            expr = F(name)
+            order_by.append(
+                expr.desc(nulls_last=True) if desc else expr.asc(nulls_last=True)
+            )
+        queryset = queryset.order_by(*order_by)
+
+        values = self._decode_cursor(request, self.ordering)
+        if values is not None:
+            queryset = queryset.filter(
+                self._after(queryset.model, self.ordering, values)
+            )
+
+        # Fetch one extra row to know whether there is a next page
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        values = []
+        for term in self.ordering:
+            name, _ = self._split(term)
+            value = last.pk if name == "pk" else getattr(last, name)
+            values.append(None if value is None else str(value))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self._encode_cursor(self.ordering, values)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
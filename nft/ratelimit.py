@@ -0,0 +1,96 @@
+"""Token-bucket rate limiting for outbound requests, shared by every process.
+
+Each upstream host gets a bucket of `rate` tokens refilled every `period`
+seconds (UPSTREAM_RATE_LIMITS setting). Tokens are counted with atomic
+cache.incr calls, so with a Redis CACHE_URL all gunicorn and Celery processes
+draw from one budget; with the local-memory cache the budget is per process.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from random import random
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .exceptions import RateLimitTimeout
+
+logger = logging.getLogger(__name__)
+
+# Wait cap set by request_wait() for calls made while serving an HTTP request
+_request_max_wait: ContextVar[Optional[float]] = ContextVar(
+    "ratelimit_request_max_wait", default=None
+)
+
+
+@contextmanager
+def request_wait():
+    """Cap the token wait at UPSTREAM_RATE_LIMIT_REQUEST_MAX_WAIT inside the block.
+
+    Views that call upstream wrap themselves in it (it also works as a
+    decorator), so an exhausted budget fails fast instead of holding a gunicorn
+    worker for UPSTREAM_RATE_LIMIT_MAX_WAIT.
+    """
+    token = _request_max_wait.set(
+        getattr(settings, "UPSTREAM_RATE_LIMIT_REQUEST_MAX_WAIT", 5.0)
+    )
+    try:
+        yield
+    finally:
+        _request_max_wait.reset(token)
+
+
+def _limit_for(host: str) -> Optional[Tuple[int, float]]:
+    cfg = getattr(settings, "UPSTREAM_RATE_LIMITS", {}).get(host)
+    if not cfg:
+        return None
+    return int(cfg["rate"]), float(cfg.get("period", 1.0))
+
+
+def acquire(host: str, *, max_wait: Optional[float] = None) -> None:
+    """Block until a token for `host` is available.
+
+    Hosts without a configured limit pass straight through. Fails open when the
+    cache backend errors, so a cache outage never blocks upstream calls.
+    Raises RateLimitTimeout after `max_wait` seconds (the request_wait() cap
+    when inside one, else UPSTREAM_RATE_LIMIT_MAX_WAIT).
+    """
+    limit = _limit_for(host)
+    if limit is None:
+        return
+    rate, period = limit
+    if max_wait is None:
+        max_wait = _request_max_wait.get()
+    if max_wait is None:
+        max_wait = getattr(settings, "UPSTREAM_RATE_LIMIT_MAX_WAIT", 30.0)
+    deadline = time.monotonic() + max_wait
+    while True:
+        now = time.time()
+        window = int(now // period)
+        key = f"nft:ratelimit:{host}:{window}"
+        try:
+            cache.add(key, 0, int(period * 2) + 1)
+            used = cache.incr(key)
+        except Exception as e:  # noqa: BLE001 - cache backend errors are varied
+            logger.debug("Rate limiter unavailable for %s: %s", host, e)
+            return
+        if used <= rate:
+            return
+        # Bucket empty: wait for the next refill, with jitter to spread wakeups
+        wait = (window + 1) * period - now + random() * 0.05
+        if time.monotonic() + wait > deadline:
+            raise RateLimitTimeout(f"Rate limit budget exhausted for {host}")
+        time.sleep(wait)
+
+
+def acquire_for_url(url: str, *, max_wait: Optional[float] = None) -> None:
+    """acquire() keyed by the URL's host."""
+    host = urlparse(url).hostname
+    if host:
+        acquire(host, max_wait=max_wait)
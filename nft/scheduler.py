@@ -0,0 +1,203 @@
+"""Popularity-weighted adaptive scheduling of NFT price refreshes.
+
+Every NFTItem has a refresh_interval_seconds derived from recent page views
+(NFTItemAccess), seven_day_sales_count and price_volatility, plus a
+next_refresh_at. The indexed next_refresh_at column works as the priority queue:
+each scheduler tick claims the most overdue items, up to the share of the
+Immutable rate budget reserved for background refreshes, and pushes their next
+refresh forward by their own interval.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import NFTItem, NFTItemAccess
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_HOST = "api.x.immutable.com"
+# Immutable queries made per refresh chunk: the active order book
+# (tasks.update_nft_prices_chunk) and the filled orders (services.sync_sales_batch),
+# each at least one page
+REQUESTS_PER_CHUNK = 2
+
+_DEFAULTS: Dict[str, Any] = {
+    "min_interval": 15 * 60,
+    "max_interval": 24 * 60 * 60,
+    "views_window_hours": 24,
+    "view_weight": 1.0,
+    "sales_weight": 1.0,
+    "volatility_weight": 50.0,
+    "volatility_alpha": 0.3,
+    "budget_share": 0.8,
+    "tick_seconds": 60,
+}
+
+
+def _config() -> Dict[str, Any]:
+    return {**_DEFAULTS, **getattr(settings, "NFT_ADAPTIVE_REFRESH", {})}
+
+
+def compute_refresh_interval(
+    views: int,
+    sales_count: int,
+    volatility: float,
+    cfg: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Seconds between refreshes: max_interval shrunk by a popularity/volatility score.
+
+    score = views * view_weight + daily sales * sales_weight + volatility * volatility_weight
+    interval = max_interval / (1 + score), clamped to [min_interval, max_interval].
+    """
+    cfg = cfg or _config()
+    score = (
+        max(views, 0) * cfg["view_weight"]
+        + max(sales_count or 0, 0) / 7.0 * cfg["sales_weight"]
+        + max(volatility or 0.0, 0.0) * cfg["volatility_weight"]
+    )
+    interval = cfg["max_interval"] / (1.0 + score)
+    return int(min(max(interval, cfg["min_interval"]), cfg["max_interval"]))
+
+
+def next_volatility(
+    old_price: Optional[Decimal],
+    new_price: Optional[Decimal],
+    previous: float,
+    cfg: Optional[Dict[str, Any]] = None,
+) -> float:
+    """Fold the relative price change of one refresh into the volatility EWMA."""
+    cfg = cfg or _config()
+    if not old_price or old_price <= 0 or new_price is None:
+        return previous or 0.0
+    change = float(abs(Decimal(new_price) - old_price) / old_price)
+    alpha = cfg["volatility_alpha"]
+    return round(alpha * change + (1 - alpha) * (previous or 0.0), 6)
+
+
+def refresh_budget(tick_seconds: Optional[int] = None) -> int:
+    """How many product codes one tick may hand to the refresh workers.
+
+    Each chunk of NFT_REFRESH_CHUNK_SIZE codes costs at least REQUESTS_PER_CHUNK
+    Immutable requests; budget_share of the host's rate limit is reserved for
+    refreshes so interactive upserts still get through.
+    """
+    cfg = _config()
+    tick_seconds = tick_seconds or cfg["tick_seconds"]
+    chunk_size = getattr(settings, "NFT_REFRESH_CHUNK_SIZE", 25)
+    limit = getattr(settings, "UPSTREAM_RATE_LIMITS", {}).get(IMMUTABLE_HOST)
+    if not limit:
+        return chunk_size
+    requests = limit["rate"] / limit["period"] * tick_seconds * cfg["budget_share"]
+    return max(int(requests / REQUESTS_PER_CHUNK), 1) * chunk_size
+
+
+def _eligible():
+    return NFTItem.objects.filter(product_code__isnull=False).exclude(
+        product_code__exact=""
+    )
+
+
+def due_count(now: Optional[datetime] = None) -> int:
+    now = now or timezone.now()
+    return (
+        _eligible()
+        .filter(Q(next_refresh_at__isnull=True) | Q(next_refresh_at__lte=now))
+        .count()
+    )
+
+
+def claim_due_items(limit: int, now: Optional[datetime] = None) -> List[str]:
+    """Return up to `limit` due product codes, most overdue first (never refreshed
+    items lead), and move each one's next_refresh_at forward by its interval.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        qs = (
+            _eligible()
+            .filter(Q(next_refresh_at__isnull=True) | Q(next_refresh_at__lte=now))
+            .order_by(F("next_refresh_at").asc(nulls_first=True), "pk")
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            # Overlapping ticks claim disjoint sets instead of waiting on each other
+            qs = qs.select_for_update(skip_locked=True)
+        rows = list(
+            qs.values_list("pk", "product_code", "refresh_interval_seconds")[:limit]
+        )
+        claimed = [
+            NFTItem(pk=pk, next_refresh_at=now + timedelta(seconds=interval))
+            for pk, _, interval in rows
+        ]
+        NFTItem.objects.bulk_update(claimed, ["next_refresh_at"], batch_size=500)
+    return [code for _, code, _ in rows]
+
+
+def recompute_refresh_intervals(now: Optional[datetime] = None) -> int:
+    """Recompute every item's interval from current demand; returns rows changed.
+
+    next_refresh_at is moved to last refresh + new interval, so an item that
+    became hotter does not wait out its old, longer slot. The last refresh is
+    when the item was last claimed: next_refresh_at minus refresh_interval_seconds,
+    an invariant kept here and by claim_due_items (updated_at only moves when
+    the price changes).
+    """
+    cfg = _config()
+    now = now or timezone.now()
+    since = now - timedelta(hours=cfg["views_window_hours"])
+    views = dict(
+        NFTItemAccess.objects.filter(accessed_at__gte=since)
+        .values("item_id")
+        .annotate(n=Count("id"))
+        .values_list("item_id", "n")
+    )
+
+    changed: List[NFTItem] = []
+    total = 0
+    items = (
+        _eligible()
+        .only(
+            "id",
+            "refresh_interval_seconds",
+            "next_refresh_at",
+            "seven_day_sales_count",
+            "price_volatility",
+        )
+        .iterator(chunk_size=2000)
+    )
+    for item in items:
+        interval = compute_refresh_interval(
+            views.get(item.pk, 0),
+            item.seven_day_sales_count,
+            item.price_volatility,
+            cfg,
+        )
+        if interval == item.refresh_interval_seconds:
+            continue
+        if item.next_refresh_at is not None:
+            claimed_at = item.next_refresh_at - timedelta(
+                seconds=item.refresh_interval_seconds
+            )
+            item.next_refresh_at = claimed_at + timedelta(seconds=interval)
+        item.refresh_interval_seconds = interval
+        changed.append(item)
+        if len(changed) >= 500:
+            total += _save_intervals(changed)
+            changed = []
+    if changed:
+        total += _save_intervals(changed)
+    return total
+
+
+def _save_intervals(items: List[NFTItem]) -> int:
+    NFTItem.objects.bulk_update(
+        items, ["refresh_interval_seconds", "next_refresh_at"], batch_size=500
+    )
+    return len(items)
@@ -0,0 +1,134 @@
+"""Search backend for NFT items.
+
+On PostgreSQL a search term matches an item when any of these hold:
+- its search_vector matches the term as an English, Portuguese or unstemmed
+  prefix query;
+- every word occurs inside name, name_pt_br or product_code (the old icontains
+  semantics, now served by pg_trgm indexes);
+- the whole term is fuzzily word-similar to one of those columns (typos).
+
+Migration 0012 creates the trigger that keeps search_vector in sync on every
+write path, including bulk updates, and all the indexes involved.
+
+With ?search_mode=ranked the results are ordered by relevance: ts_rank plus
+the best trigram word similarity. An explicit ?ordering= still wins. On other
+databases (SQLite in development) matching falls back to DRF's icontains
+search, and ranking to exact product_code > prefix > substring.
+"""
+
+from __future__ import annotations
+
+import operator
+import re
+from functools import reduce
+from typing import List
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, Upper
+from rest_framework import filters as drf_filters
+
+SEARCH_MODE_PARAM = "search_mode"
+RANKED = "ranked"
+_SEARCH_CONFIGS = ("english", "portuguese", "simple")
+
+
+def is_ranked(request) -> bool:
+    return request.query_params.get(SEARCH_MODE_PARAM) == RANKED
+
+
+def _prefix_tsquery(terms: List[str]) -> str:
+    # Only word characters reach to_tsquery, so user input cannot break its syntax
+    words = [w for term in terms for w in re.findall(r"\w+", term)]
+    return " & ".join(f"{w}:*" for w in words)
+
+
+class NFTItemSearchFilter(drf_filters.SearchFilter):
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if connections[queryset.db].vendor == "postgresql":
+            return self._postgres(request, queryset, view, terms)
+
+        queryset = super().filter_queryset(request, queryset, view)
+        if is_ranked(request):
+            term = " ".join(terms)
+            queryset = queryset.annotate(
+                search_rank=Case(
+                    When(product_code__iexact=term, then=Value(3)),
+                    When(
+                        Q(name__istartswith=term) | Q(name_pt_br__istartswith=term),
+                        then=Value(2),
+                    ),
+                    default=Value(1),
+                    output_field=IntegerField(),
+                )
+            ).order_by("-search_rank", "pk")
+        return queryset
+
+    def _postgres(self, request, queryset, view, terms):
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVectorField,
+            TrigramWordSimilarity,
+        )
+
+        fields = self.get_search_fields(view, request) or []
+        term = " ".join(terms)
+        # Column maintained by the trigger from migration 0012; not a model field
+        vector = RawSQL(
+            f'"{queryset.model._meta.db_table}"."search_vector"',
+            [],
+            output_field=SearchVectorField(),
+        )
+
+        condition = Q()
+        tsquery = _prefix_tsquery(terms)
+        query = None
+        if tsquery:
+            query = reduce(
+                operator.or_,
+                (
+                    SearchQuery(tsquery, config=config, search_type="raw")
+                    for config in _SEARCH_CONFIGS
+                ),
+            )
+            queryset = queryset.alias(search_vector=vector)
+            condition |= Q(search_vector=query)
+        if fields:
+            condition |= reduce(
+                operator.and_,
+                (
+                    reduce(
+                        operator.or_,
+                        (Q(**{f"{field}__icontains": t}) for field in fields),
+                    )
+                    for t in terms
+                ),
+            )
+            condition |= reduce(
+                operator.or_,
+                (Q(TrigramWordSimilar(Upper(field), term)) for field in fields),
+            )
+        queryset = queryset.filter(condition)
+
+        if is_ranked(request) and (fields or query is not None):
+            similarities = [TrigramWordSimilarity(term, field) for field in fields]
+            rank = None
+            if similarities:
+                rank = (
+                    Greatest(*similarities)
+                    if len(similarities) > 1
+                    else similarities[0]
+                )
+            if query is not None:
+                text_rank = SearchRank(vector, query)
+                rank = text_rank if rank is None else rank + text_rank
+            queryset = queryset.annotate(search_rank=rank).order_by(
+                "-search_rank", "pk"
+            )
+        return queryset
@@ -27,7 +27,14 @@ class NFTItemSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = NFTItem
-        fields = "__all__"
+        # Everything except refresh bookkeeping, which changes without user-visible edits
+        exclude = [
+            "price_fingerprint",
+            "refresh_interval_seconds",
+            "next_refresh_at",
+            "price_volatility",
+            "sales_synced_at",
+        ]
         # Expose extra computed fields as well (for documentation only)
         extra_fields = [
             "collection_slug",
@@ -36,6 +43,94 @@ class NFTItemSerializer(serializers.ModelSerializer):
             "name_pt_br",
         ]
 
+    # Predefined projections for ?profile=; "card" is what grid cards render
+    PROFILES = {
+        "card": (
+            "id",
+            "name",
+            "original_name",
+            "name_pt_br",
+            "product_code",
+            "image_url",
+            "rarity",
+            "item_type",
+            "item_sub_type",
+            "material",
+            "last_price_brl",
+            "collection",
+            "collection_slug",
+            "collection_name",
+            "seven_day_price_change_pct",
+        ),
+    }
+    # Model columns read by computed fields
+    SOURCE_COLUMNS = {
+        "name": ("name", "name_pt_br"),
+        "original_name": ("name",),
+    }
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldset: drop everything not requested
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, request):
+        """Output fields asked for with ?profile= and/or ?fields= (comma-separated,
+        merged), or None for the full representation.
+        """
+        profile = request.query_params.get("profile")
+        raw = request.query_params.get("fields")
+        if not profile and not raw:
+            return None
+        if profile and profile not in cls.PROFILES:
+            raise serializers.ValidationError(
+                {"profile": f"Perfil inválido; opções: {', '.join(cls.PROFILES)}"}
+            )
+        fields = list(cls.PROFILES.get(profile, ()))
+        fields += [f.strip() for f in (raw or "").split(",") if f.strip()]
+        unknown = sorted(set(fields) - set(cls().fields))
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": f"Campos inválidos: {', '.join(unknown)}"}
+            )
+        return list(dict.fromkeys(fields))
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, extra_columns=()):
+        """Join the collection in the same query, loading only the columns serialized.
+
+        With fields (a sparse fieldset) the SELECT is narrowed to the columns
+        those fields read, plus extra_columns (e.g. ordering keys the paginator reads).
+        """
+        if fields is None:
+            item_fields = [
+                f.attname
+                for f in NFTItem._meta.concrete_fields
+                if f.name not in cls.Meta.exclude
+            ]
+            return queryset.select_related("collection").only(
+                *item_fields, "collection__slug", "collection__name"
+            )
+
+        queryset = queryset.select_related(None)
+        columns = ["pk", *extra_columns]
+        related = []
+        for name in fields:
+            if name == "collection_slug":
+                related.append("collection__slug")
+            elif name == "collection_name":
+                related.append("collection__name")
+            else:
+                columns.extend(cls.SOURCE_COLUMNS.get(name, (name,)))
+        if related:
+            # Deferring collection_id would break the join
+            columns.append("collection")
+            queryset = queryset.select_related("collection")
+        return queryset.only(*dict.fromkeys(columns + related))
+
     def get_collection_slug(self, obj):
         try:
             return obj.collection.slug if obj.collection else None
@@ -88,3 +183,84 @@ class PricingConfigSerializer(serializers.ModelSerializer):
         model = PricingConfig
         fields = ["global_markup_percent", "updated_at"]
         read_only_fields = ["updated_at"]
+
+
+class PriceHistoryQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    interval = serializers.ChoiceField(choices=["hour", "day"], required=False)
+
+    def validate(self, attrs: Any) -> Any:
+        start, end = attrs.get("start"), attrs.get("end")
+        if start and end and start >= end:
+            raise serializers.ValidationError("start deve ser anterior a end")
+        return attrs
+
+
+class PricePointSerializer(serializers.Serializer):
+    t = serializers.DateTimeField()
+    eth = serializers.DecimalField(max_digits=38, decimal_places=9)
+    usd = serializers.DecimalField(max_digits=18, decimal_places=2)
+    brl = serializers.DecimalField(max_digits=18, decimal_places=2)
+
+
+class FacetValueSerializer(serializers.Serializer):
+    value = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class CollectionFacetSerializer(serializers.Serializer):
+    value = serializers.IntegerField()
+    slug = serializers.CharField()
+    name = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class FacetsSerializer(serializers.Serializer):
+    rarity = FacetValueSerializer(many=True)
+    item_type = FacetValueSerializer(many=True)
+    item_sub_type = FacetValueSerializer(many=True)
+    material = FacetValueSerializer(many=True)
+    source = FacetValueSerializer(many=True)
+    collection = CollectionFacetSerializer(many=True)
+
+
+class FacetCountsSerializer(serializers.Serializer):
+    total = serializers.IntegerField()
+    facets = FacetsSerializer()
+
+
+class TypeaheadQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100, trim_whitespace=True)
+    limit = serializers.IntegerField(
+        required=False, min_value=1, max_value=50, default=10
+    )
+
+
+class TypeaheadEntrySerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=["item", "collection"])
+    id = serializers.IntegerField()
+    label = serializers.CharField()
+    name_pt_br = serializers.CharField(required=False)
+    product_code = serializers.CharField(required=False)
+    slug = serializers.CharField(required=False)
+    image_url = serializers.CharField(allow_blank=True)
+
+
+class ListingQuerySerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False, allow_blank=True)
+    page_size = serializers.IntegerField(
+        required=False, min_value=1, max_value=200, default=50
+    )
+
+
+class ListingSerializer(serializers.Serializer):
+    id = serializers.CharField()
+    price_eth = serializers.DecimalField(max_digits=38, decimal_places=18)
+    price_usd = serializers.DecimalField(max_digits=18, decimal_places=2)
+    price_brl = serializers.DecimalField(max_digits=18, decimal_places=2)
+    quantity = serializers.IntegerField()
+    expiration = serializers.DateTimeField(allow_null=True)
+    seller = serializers.CharField(allow_null=True)
+    token_address = serializers.CharField(allow_null=True)
+    token_id = serializers.CharField(allow_null=True)
@@ -1,29 +1,54 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 
-import requests
-from .models import PricingConfig, NFTItem
+from django.core.cache import cache
+from django.db.models import Avg, Count, OuterRef, Q, Subquery, Sum
+
+from core.response_cache import bump_model_version_on_commit
+
+from . import orderbook_cache
+from .exceptions import (
+    CircuitOpenError,
+    ImmutableAPIError,
+    IncompletePaginationError,
+    RateLimitTimeout,
+)
+from .http_client import get_session
+from .models import ExchangeRate, PricingConfig, NFTItem, NFTSale
 import time
 from random import random
 
-
 logger = logging.getLogger(__name__)
 
 
 IMMUTABLE_BASE_URL = "https://api.x.immutable.com/v3/orders"
+IMMUTABLE_HEADERS = {"Accept": "application/json", "Content-Type": "application/json"}
 
 DEFAULT_MARKUP_MULTIPLIER = Decimal("1.30")
 
-# Simple in-process cache for rates to avoid frequent 429s and reduce latency
+# FX rates are cached in two tiers: this process (_RATES_CACHE) and the shared
+# Django cache (Redis in production), with ExchangeRate rows as last-known-good.
+# nft.tasks.refresh_fx_rates keeps them warm; readers never fetch upstream.
 _RATES_CACHE: Optional[Tuple[Decimal, Decimal, float]] = (
-    None  # (eth_usd, usd_brl, expires_at_epoch)
+    None  # (eth_usd, usd_brl, fetched_at_epoch)
 )
 _RATES_TTL_SECONDS = 180.0  # 3 minutes
+_RATES_CACHE_KEY = "nft:fx_rates"  # (eth_usd, usd_brl, fetched_at_epoch)
+# Shared entries outlive their TTL so stale values can be served during a refresh
+_RATES_STALE_SECONDS = 60 * 60 * 24
+_RATES_LOCK_KEY = "nft:fx_rates:refresh"
+_RATES_LOCK_TIMEOUT = 60
+ETH_USD_PAIR = "ETH-USD"
+USD_BRL_PAIR = "USD-BRL"
+# Only used until a first successful fetch has been stored in ExchangeRate
+BOOTSTRAP_ETH_USD = Decimal("4713.59")
+BOOTSTRAP_USD_BRL = Decimal("5.42")
 
 
 def _get_markup_multiplier_for(product_code: Optional[str]) -> Decimal:
@@ -52,8 +77,87 @@ def _get_markup_multiplier_for(product_code: Optional[str]) -> Decimal:
     return DEFAULT_MARKUP_MULTIPLIER
 
 
-class ImmutableAPIError(Exception):
-    """Raised when Immutable API returns a non-success status code."""
+def _percent_to_multiplier(percent: Any) -> Decimal:
+    return Decimal("1") + (Decimal(percent) / Decimal("100"))
+
+
+# Bumped by nft.signals whenever PricingConfig or NFTItem.markup_percent is saved
+_MARKUP_GENERATION = 0
+
+
+def invalidate_markup_cache() -> None:
+    """Mark every MarkupResolver loaded in this process as stale."""
+    global _MARKUP_GENERATION
+    _MARKUP_GENERATION += 1
+
+
+class MarkupResolver:
+    """Resolve markup multipliers once per refresh instead of once per order.
+
+    Loads the latest PricingConfig and the per-item markup_percent of the given
+    product codes with two queries; codes not preloaded are looked up lazily and
+    memoized. The loaded values are dropped when invalidate_markup_cache() runs.
+    """
+
+    def __init__(self, product_codes: Optional[List[str]] = None) -> None:
+        self._preload = [c for c in (product_codes or []) if c]
+        self._load()
+
+    def _load(self) -> None:
+        self._generation = _MARKUP_GENERATION
+        self._items: Dict[str, Optional[Decimal]] = {}
+        self._global: Decimal = DEFAULT_MARKUP_MULTIPLIER
+        try:
+            cfg = (
+                PricingConfig.objects.order_by("-updated_at")
+                .only("global_markup_percent")
+                .first()
+            )
+            if cfg and cfg.global_markup_percent is not None:
+                self._global = _percent_to_multiplier(cfg.global_markup_percent)
+            if self._preload:
+                self._items = {code: None for code in self._preload}
+                rows = NFTItem.objects.filter(
+                    product_code__in=self._preload, markup_percent__isnull=False
+                ).values_list("product_code", "markup_percent")
+                for code, percent in rows:
+                    self._items[code] = _percent_to_multiplier(percent)
+        except Exception:
+            pass
+
+    def multiplier_for(self, product_code: Optional[str]) -> Decimal:
+        """Return (1 + markup/100) for the item, falling back to the global markup."""
+        if self._generation != _MARKUP_GENERATION:
+            self._load()
+        if not product_code:
+            return self._global
+        if product_code not in self._items:
+            mult: Optional[Decimal] = None
+            try:
+                item = (
+                    NFTItem.objects.filter(product_code=product_code)
+                    .only("markup_percent")
+                    .first()
+                )
+                if item and item.markup_percent is not None:
+                    mult = _percent_to_multiplier(item.markup_percent)
+            except Exception:
+                pass
+            self._items[product_code] = mult
+        return self._items[product_code] or self._global
+
+
+def _backoff_seconds(backoff_factor: float, attempt: int) -> float:
+    """Exponential backoff with a little jitter, used by _get_json_with_retries."""
+    return backoff_factor * (2**attempt) + (random() * 0.1)
+
+
+def _merge_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    base_headers = {
+        "Accept": "application/json",
+        "User-Agent": "nft-portal/1.0",
+    }
+    return {**base_headers, **(headers or {})}
 
 
 def _get_json_with_retries(
@@ -67,18 +171,17 @@ def _get_json_with_retries(
     status_forcelist: Tuple[int, ...] = (429, 500, 502, 503, 504),
 ) -> Optional[Any]:
     """Perform GET with basic retries and exponential backoff.
+    Uses the pooled keep-alive session from http_client.
     Returns parsed JSON on success, or None on repeated failure.
+    Raises CircuitOpenError immediately while the host's circuit breaker is open,
+    and RateLimitTimeout when the host's rate budget stayed exhausted.
     """
     attempt = 0
     # Perform up to `retries` attempts total
     while attempt < retries:
         try:
-            base_headers = {
-                "Accept": "application/json",
-                "User-Agent": "nft-portal/1.0",
-            }
-            merged_headers = {**base_headers, **(headers or {})}
-            resp = requests.get(
+            merged_headers = _merge_headers(headers)
+            resp = get_session().get(
                 url, params=params, headers=merged_headers, timeout=timeout
             )
             if resp.status_code == 200:
@@ -89,7 +192,7 @@ def _get_json_with_retries(
                     return None
             if resp.status_code in status_forcelist:
                 # Backoff and retry
-                sleep_s = backoff_factor * (2**attempt) + (random() * 0.1)
+                sleep_s = _backoff_seconds(backoff_factor, attempt)
                 logger.warning(
                     "HTTP %s from %s; retrying in %.2fs (attempt %d/%d)",
                     resp.status_code,
@@ -104,9 +207,15 @@ def _get_json_with_retries(
             # Non-retriable status
             logger.warning("HTTP %s from %s; not retrying", resp.status_code, url)
             return None
+        except CircuitOpenError:
+            # Upstream is known to be down; don't burn the retry budget
+            raise
+        except RateLimitTimeout:
+            # Already waited max_wait for a token; retrying would wait again
+            raise
         except Exception as e:
             # Network error; retry with backoff
-            sleep_s = backoff_factor * (2**attempt) + (random() * 0.1)
+            sleep_s = _backoff_seconds(backoff_factor, attempt)
             logger.warning(
                 "GET failed %s: %s; retrying in %.2fs (attempt %d/%d)",
                 url,
@@ -120,20 +229,8 @@ def _get_json_with_retries(
     return None
 
 
-def get_current_rates() -> Tuple[Decimal, Decimal]:
-    """
-    Fetch current conversion rates.
-
-    Returns tuple (eth_usd, usd_brl) as Decimals.
-    On failure, returns fallback values.
-    """
-    # Serve from cache if valid
-    global _RATES_CACHE
-    now = time.time()
-    if _RATES_CACHE is not None:
-        eth_usd_cached, usd_brl_cached, exp = _RATES_CACHE
-        if now < exp:
-            return eth_usd_cached, usd_brl_cached
+def _fetch_rates_upstream() -> Tuple[Optional[Decimal], Optional[Decimal]]:
+    """Fetch (eth_usd, usd_brl) from CoinGecko and AwesomeAPI; None where a fetch failed."""
     eth_usd: Optional[Decimal] = None
     usd_brl: Optional[Decimal] = None
 
@@ -167,13 +264,158 @@ def get_current_rates() -> Tuple[Decimal, Decimal]:
     except Exception as e:  # noqa: BLE001
         logger.warning("AwesomeAPI fetch failed: %s", e)
 
-    # Fallbacks if any are missing
-    if eth_usd is None:
-        eth_usd = Decimal("4713.59")
-    if usd_brl is None:
-        usd_brl = Decimal("5.42")
-    # Update cache
-    _RATES_CACHE = (eth_usd, usd_brl, now + _RATES_TTL_SECONDS)
+    return eth_usd, usd_brl
+
+
+def _last_known_good_rates() -> Tuple[Decimal, Decimal, Optional[float]]:
+    """Return (eth_usd, usd_brl, fetched_at_epoch) from ExchangeRate.
+    fetched_at is None when no pair was ever fetched successfully.
+    """
+    eth_usd, usd_brl = BOOTSTRAP_ETH_USD, BOOTSTRAP_USD_BRL
+    fetched_at: Optional[float] = None
+    try:
+        rows = ExchangeRate.objects.filter(
+            pair__in=[ETH_USD_PAIR, USD_BRL_PAIR]
+        ).values_list("pair", "rate", "updated_at")
+        for pair, rate, updated_at in rows:
+            if pair == ETH_USD_PAIR:
+                eth_usd = rate
+            else:
+                usd_brl = rate
+            ts = updated_at.timestamp()
+            # Age is driven by the oldest pair
+            fetched_at = ts if fetched_at is None else min(fetched_at, ts)
+    except Exception as e:  # noqa: BLE001 - DB may be unavailable
+        logger.warning("Last-known-good rates unavailable: %s", e)
+    return eth_usd, usd_brl, fetched_at
+
+
+def get_fallback_rates() -> Tuple[Decimal, Decimal]:
+    """Return the last-known-good (eth_usd, usd_brl) stored in ExchangeRate.
+    Uses the bootstrap constants only for pairs that were never fetched successfully.
+    """
+    eth_usd, usd_brl, _ = _last_known_good_rates()
+    return eth_usd, usd_brl
+
+
+class FallbackRates:
+    """get_fallback_rates() read lazily, at most once per instance.
+
+    Share one instance across the orders of a snapshot or batch so the
+    implausible-BRL check in _convert_order_to_prices costs one query at most.
+    """
+
+    def __init__(self) -> None:
+        self._rates: Optional[Tuple[Decimal, Decimal]] = None
+
+    def __call__(self) -> Tuple[Decimal, Decimal]:
+        if self._rates is None:
+            self._rates = get_fallback_rates()
+        return self._rates
+
+
+def _store_rates(eth_usd: Decimal, usd_brl: Decimal, fetched_at: float) -> None:
+    """Publish rates to the local tier and the shared cache."""
+    global _RATES_CACHE
+    _RATES_CACHE = (eth_usd, usd_brl, fetched_at)
+    try:
+        cache.set(
+            _RATES_CACHE_KEY, (eth_usd, usd_brl, fetched_at), _RATES_STALE_SECONDS
+        )
+    except Exception as e:  # noqa: BLE001 - cache backend errors are varied
+        logger.warning("Shared rate cache write failed: %s", e)
+
+
+def refresh_rates() -> Tuple[Decimal, Decimal]:
+    """Fetch rates upstream and persist them to every tier.
+    Pairs that fail upstream keep their last-known-good value.
+    Releases the refresh lock taken by _schedule_rates_refresh.
+    """
+    try:
+        eth_usd, usd_brl = _fetch_rates_upstream()
+    finally:
+        try:
+            cache.delete(_RATES_LOCK_KEY)
+        except Exception:  # noqa: BLE001
+            pass
+    try:
+        for pair, rate in ((ETH_USD_PAIR, eth_usd), (USD_BRL_PAIR, usd_brl)):
+            if rate is not None:
+                ExchangeRate.objects.update_or_create(
+                    pair=pair, defaults={"rate": rate}
+                )
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Persisting last-known-good rates failed: %s", e)
+    if eth_usd is None or usd_brl is None:
+        fallback_eth_usd, fallback_usd_brl = get_fallback_rates()
+        eth_usd = eth_usd if eth_usd is not None else fallback_eth_usd
+        usd_brl = usd_brl if usd_brl is not None else fallback_usd_brl
+    _store_rates(eth_usd, usd_brl, time.time())
+    return eth_usd, usd_brl
+
+
+def _schedule_rates_refresh() -> None:
+    """Enqueue a background rate refresh, at most one in flight across processes."""
+    try:
+        if not cache.add(_RATES_LOCK_KEY, time.time(), _RATES_LOCK_TIMEOUT):
+            return
+    except Exception:  # noqa: BLE001
+        return
+    try:
+        from .tasks import refresh_fx_rates
+
+        refresh_fx_rates.delay()
+    except Exception as e:  # noqa: BLE001 - broker unavailable
+        # Keep the lock so we retry at most once per lock timeout
+        logger.warning("Could not enqueue FX rate refresh: %s", e)
+
+
+def get_current_rates_with_age() -> Tuple[Decimal, Decimal, float]:
+    """
+    Return (eth_usd, usd_brl, age_seconds) without waiting on upstream APIs.
+
+    Serves the process cache, then the shared cache, then the last-known-good
+    rates from the database. When the value is older than the TTL a background
+    refresh is enqueued (stale-while-revalidate). Only a cold start with no
+    stored rates at all fetches synchronously.
+    """
+    global _RATES_CACHE
+    now = time.time()
+    if _RATES_CACHE is not None:
+        eth_usd, usd_brl, fetched_at = _RATES_CACHE
+        if now < fetched_at + _RATES_TTL_SECONDS:
+            return eth_usd, usd_brl, now - fetched_at
+
+    shared: Optional[Tuple[Decimal, Decimal, float]] = None
+    try:
+        shared = cache.get(_RATES_CACHE_KEY)
+    except Exception as e:  # noqa: BLE001
+        logger.warning("Shared rate cache read failed: %s", e)
+    if shared is not None:
+        eth_usd, usd_brl, fetched_at = shared
+        _RATES_CACHE = (eth_usd, usd_brl, fetched_at)
+        if now >= fetched_at + _RATES_TTL_SECONDS:
+            _schedule_rates_refresh()
+        return eth_usd, usd_brl, now - fetched_at
+
+    eth_usd, usd_brl, stored_at = _last_known_good_rates()
+    if stored_at is None:
+        eth_usd, usd_brl = refresh_rates()
+        return eth_usd, usd_brl, 0.0
+    # Shared cache is empty (e.g. flushed): warm it from the database
+    _store_rates(eth_usd, usd_brl, stored_at)
+    if now >= stored_at + _RATES_TTL_SECONDS:
+        _schedule_rates_refresh()
+    return eth_usd, usd_brl, now - stored_at
+
+
+def get_current_rates() -> Tuple[Decimal, Decimal]:
+    """
+    Fetch current conversion rates.
+
+    Returns tuple (eth_usd, usd_brl) as Decimals; see get_current_rates_with_age.
+    """
+    eth_usd, usd_brl, _ = get_current_rates_with_age()
     return eth_usd, usd_brl
 
 
@@ -206,12 +448,16 @@ def _convert_order_to_prices(
     usd_brl: Decimal,
     *,
     product_code: Optional[str] = None,
+    markup: Optional[MarkupResolver] = None,
+    fallback_rates: Optional[FallbackRates] = None,
 ) -> Optional[Tuple[Decimal, Decimal, Decimal]]:
     """Return last_price_eth, last_price_usd, last_price_brl (all with markup applied) for the given order.
     Supports:
       - ETH-denominated orders (18 decimals, convert via eth_usd)
       - ERC20 stablecoins with 6 decimals (treated as USD directly)
     Returns None when token type is unsupported.
+    Pass a MarkupResolver to avoid per-order markup queries, and a shared
+    FallbackRates to avoid per-order fallback-rate queries.
     """
     try:
         buy_type, qty_int, decimals, _ = _extract_buy_info(order)
@@ -233,8 +479,9 @@ def _convert_order_to_prices(
             # recompute BRL using fallback rates so we never show R$ 0,xx for ~0.07 ETH.
             try:
                 if eth_raw > Decimal("0.01") and price_brl_pre < Decimal("10"):
-                    fallback_eth_usd = Decimal("4713.59")
-                    fallback_usd_brl = Decimal("5.42")
+                    fallback_eth_usd, fallback_usd_brl = (
+                        fallback_rates or get_fallback_rates
+                    )()
                     brl_fb = (
                         float(eth_raw)
                         * float(fallback_eth_usd)
@@ -266,7 +513,11 @@ def _convert_order_to_prices(
             return None
 
         # Apply markup using admin-configured multiplier (round after applying)
-        mult = _get_markup_multiplier_for(product_code)
+        mult = (
+            markup.multiplier_for(product_code)
+            if markup is not None
+            else _get_markup_multiplier_for(product_code)
+        )
         # ETH: apply markup to raw ETH then quantize to 8 decimals for output
         if buy_type == "ETH":
             price_eth_out = (eth_raw * mult).quantize(
@@ -294,6 +545,8 @@ def pick_best_bid_order(
     usd_brl: Decimal,
     *,
     product_code: Optional[str] = None,
+    markup: Optional[MarkupResolver] = None,
+    fallback_rates: Optional[FallbackRates] = None,
 ) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[Decimal, Decimal, Decimal]]]:
     """Select the order with the lowest BRL price, prioritizing ETH-denominated orders.
     Returns (best_order, (price_eth, price_usd, price_brl)) with markup applied, or (None, None).
@@ -302,6 +555,10 @@ def pick_best_bid_order(
     (e.g., ERC20 with unusual decimals) has led to implausibly low backend prices. To keep the
     product page price consistent with visible offers, we restrict selection to ETH orders.
     """
+    if markup is None:
+        markup = MarkupResolver([product_code] if product_code else None)
+    if fallback_rates is None:
+        fallback_rates = FallbackRates()
     best_order: Optional[Dict[str, Any]] = None
     best_prices: Optional[Tuple[Decimal, Decimal, Decimal]] = None
     best_brl: Optional[Decimal] = None
@@ -315,7 +572,12 @@ def pick_best_bid_order(
             # Skip non-ETH orders to avoid inconsistencies with listing display
             continue
         prices = _convert_order_to_prices(
-            order, eth_usd, usd_brl, product_code=product_code
+            order,
+            eth_usd,
+            usd_brl,
+            product_code=product_code,
+            markup=markup,
+            fallback_rates=fallback_rates,
         )
         if prices is None:
             continue
@@ -329,7 +591,12 @@ def pick_best_bid_order(
     if best_order is None:
         for order in orders:
             prices = _convert_order_to_prices(
-                order, eth_usd, usd_brl, product_code=product_code
+                order,
+                eth_usd,
+                usd_brl,
+                product_code=product_code,
+                markup=markup,
+                fallback_rates=fallback_rates,
             )
             if prices is None:
                 continue
@@ -365,6 +632,8 @@ def map_order_to_item_fields(
     eth_usd: Decimal,
     usd_brl: Decimal,
     override_prices: Optional[Tuple[Decimal, Decimal, Decimal]] = None,
+    markup: Optional[MarkupResolver] = None,
+    fallback_rates: Optional[FallbackRates] = None,
 ) -> Dict[str, Any]:
     """
     Map Immutable order JSON to our NFTItem fields dict.
@@ -392,10 +661,17 @@ def map_order_to_item_fields(
         price_eth, price_usd, price_brl = override_prices
     else:
         price_eth = Decimal("0")
+        price_usd = Decimal("0")
+        price_brl = Decimal("0")
         if order:
             # Try to convert based on buy leg; fallback to ETH path
             conv = _convert_order_to_prices(
-                order, eth_usd, usd_brl, product_code=product_code
+                order,
+                eth_usd,
+                usd_brl,
+                product_code=product_code,
+                markup=markup,
+                fallback_rates=fallback_rates,
             )
             if conv is not None:
                 price_eth, price_usd, price_brl = conv
@@ -410,7 +686,11 @@ def map_order_to_item_fields(
                         Decimal("0.01"), rounding=ROUND_HALF_UP
                     )
                     # Apply markup (legacy path)
-                    mult = _get_markup_multiplier_for(product_code)
+                    mult = (
+                        markup.multiplier_for(product_code)
+                        if markup is not None
+                        else _get_markup_multiplier_for(product_code)
+                    )
                     price_eth = (price_eth * mult).quantize(
                         Decimal("0.000000000000000001")
                     )
@@ -420,9 +700,6 @@ def map_order_to_item_fields(
                     price_brl = (price_brl * mult).quantize(
                         Decimal("0.01"), rounding=ROUND_HALF_UP
                     )
-                else:
-                    price_usd = Decimal("0")
-                    price_brl = Decimal("0")
 
     mapped = {
         "name": name or product_code,
@@ -447,10 +724,72 @@ def map_order_to_item_fields(
     return mapped
 
 
+def _order_id(order: Optional[Dict[str, Any]]) -> str:
+    for key in ("order_id", "id"):
+        val = (order or {}).get(key)
+        if val is not None and val != "":
+            return str(val)
+    return ""
+
+
+def compute_price_fingerprint(
+    mapped: Dict[str, Any], best_order_id: Optional[str] = None
+) -> str:
+    """Content hash of the mapped NFTItem fields plus the id of the chosen order.
+    Refreshes compare it to NFTItem.price_fingerprint to skip rows that did not change.
+    """
+    payload = {
+        k: str(v)
+        for k, v in mapped.items()
+        if k not in ("price_fingerprint", "price_volatility", "updated_at")
+    }
+    payload["_order_id"] = best_order_id or ""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _next_cursor(data: Dict[str, Any]) -> Optional[str]:
+    """Return the next page cursor from an Immutable orders page, if any."""
+
+    # Handle cursors that can be either strings or nested objects
+    def _nc(obj: Any) -> Optional[str]:
+        if isinstance(obj, dict):
+            return obj.get("next_cursor")
+        return None
+
+    return (
+        data.get("next_cursor")
+        or _nc(data.get("cursor"))
+        or _nc(data.get("page_cursor"))
+        or _nc(data.get("page"))
+    )
+
+
 def _paginate_immutable(
     params: Dict[str, Any], headers: Dict[str, str], max_pages: int = 50
 ) -> List[Dict[str, Any]]:
-    """Fetch all pages from Immutable orders endpoint using cursor."""
+    """Fetch all pages from Immutable orders endpoint using cursor.
+    Results are shared through the order-book cache (nft.orderbook_cache) for a few
+    seconds, so repeated or concurrent queries with the same params hit Immutable once.
+    Only paginations that reached their last page are cached. Raises
+    IncompletePaginationError when a page could not be read or max_pages ran out
+    before the last page; partial results are never returned.
+    """
+    results, complete = orderbook_cache.get_or_fetch(
+        {**params, "max_pages": max_pages},
+        lambda: _paginate_immutable_uncached(params, headers, max_pages),
+    )
+    if not complete:
+        raise IncompletePaginationError(
+            f"Paginação da Immutable incompleta ({len(results)} ordens lidas)"
+        )
+    return results
+
+
+def _paginate_immutable_uncached(
+    params: Dict[str, Any], headers: Dict[str, str], max_pages: int = 50
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Return (orders, complete); complete is True only when the last page was reached."""
     all_results: List[Dict[str, Any]] = []
     cursor: Optional[str] = None
     for _ in range(max_pages):
@@ -465,257 +804,552 @@ def _paginate_immutable(
             retries=4,
         )
         if not isinstance(data, dict):
-            break
+            return all_results, False
         items = data.get("result") or []
         all_results.extend(items)
-        # Handle cursors that can be either strings or nested objects
-        next_cursor = data.get("next_cursor")
+        cursor = _next_cursor(data)
+        if not cursor:
+            return all_results, True
+    # max_pages ran out with a cursor still pending
+    return all_results, False
+
+
+SEVEN_DAYS = timedelta(days=7)
+# Re-read a little before the high-water mark: orders can be marked filled late
+SALES_SYNC_OVERLAP = timedelta(minutes=10)
+_TIMESTAMP_KEYS = (
+    "updated_timestamp",
+    "timestamp",
+    "created_timestamp",
+    "filled_timestamp",
+)
+_EXPIRATION_KEYS = ("expiration_timestamp", "expiry", "expiration")
 
-        def _nc(obj: Any) -> Optional[str]:
-            if isinstance(obj, dict):
-                return obj.get("next_cursor")
-            return None
 
-        cursor = (
-            next_cursor
-            or _nc(data.get("cursor"))
-            or _nc(data.get("page_cursor"))
-            or _nc(data.get("page"))
-        )
-        if not cursor:
-            break
-    return all_results
+def _order_timestamp(
+    order: Dict[str, Any], keys: Tuple[str, ...] = _TIMESTAMP_KEYS
+) -> Optional[datetime]:
+    """First parseable timestamp among keys (epoch seconds/ms or ISO 8601), as UTC."""
+    for key in keys:
+        val = order.get(key)
+        if val is None:
+            continue
+        try:
+            if isinstance(val, (int, float)) or str(val).isdigit():
+                epoch = float(val)
+                if epoch >= 1e12:  # milliseconds
+                    epoch /= 1000
+                return datetime.fromtimestamp(epoch, tz=timezone.utc)
+            return datetime.fromisoformat(str(val).replace("Z", "+00:00"))
+        except (TypeError, ValueError, OverflowError):
+            continue
+    return None
 
 
-def fetch_7d_sales_stats(product_code: str) -> Dict[str, Any]:
-    """
-    Compute 7-day sales stats (volume, count, avg, last sale, change %) for a product_code
-    using filled orders from Immutable.
+def sync_sales_batch(
+    product_codes: List[str],
+    *,
+    markup: Optional[MarkupResolver] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Optional[datetime]]:
+    """Append filled orders newer than each product's high-water mark to NFTSale,
+    with a single paginated query for all product_codes.
+
+    Only the window since the oldest NFTItem.sales_synced_at (minus a small
+    overlap) is downloaded; each product then keeps only its own window and
+    duplicates are dropped by the unique order_id. A product's mark advances to
+    now, and is saved on the item, only when the read reached its last page and
+    returned orders for it; otherwise the previous mark is kept so the window is
+    read again next time. Returns {product_code: high-water mark}.
     """
-    now = datetime.now(timezone.utc)
-    seven_days_ago = now - timedelta(days=7)
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
+    codes = list(
+        dict.fromkeys(str(c).strip() for c in product_codes if c and str(c).strip())
+    )
+    if not codes:
+        return {}
+    now = now or datetime.now(timezone.utc)
+    marks: Dict[str, Optional[datetime]] = {code: None for code in codes}
+    marks.update(
+        NFTItem.objects.filter(product_code__in=codes).values_list(
+            "product_code", "sales_synced_at"
+        )
+    )
+    floor = now - SEVEN_DAYS
+    since = {
+        code: floor if mark is None else max(floor, mark - SALES_SYNC_OVERLAP)
+        for code, mark in marks.items()
+    }
+
     params = {
         "status": "filled",
         # Do not restrict buy token type; we will normalize to BRL
-        "sell_metadata": json.dumps({"productCode": [product_code]}),
+        "sell_metadata": json.dumps({"productCode": codes}),
         "order_by": "buy_quantity",
         "direction": "asc",
         "page_size": 200,
         # Not all deployments may support this filter; we add but still filter client-side
-        "updated_min_timestamp": int(seven_days_ago.timestamp()),
+        "updated_min_timestamp": int(min(since.values()).timestamp()),
     }
-
     try:
-        results = _paginate_immutable(params, headers)
-    except Exception:
-        results = []
+        results = _paginate_immutable(
+            params, IMMUTABLE_HEADERS, max_pages=50 * len(codes)
+        )
+    except Exception as e:
+        logger.warning("sync_sales: product_codes=%s failed: %s", ",".join(codes), e)
+        return marks
 
-    # Rates for conversion
     eth_usd, usd_brl = get_current_rates()
-
-    sales: List[Tuple[datetime, Decimal]] = []  # (timestamp, price_brl_with_markup)
-    for o in results:
-        try:
-            # Try to derive a timestamp from fields
-            ts = None
-            for key in (
-                "updated_timestamp",
-                "timestamp",
-                "created_timestamp",
-                "filled_timestamp",
-            ):
-                val = o.get(key)
-                if val is None:
-                    continue
-                if isinstance(val, (int, float)):
-                    ts_candidate = datetime.fromtimestamp(float(val), tz=timezone.utc)
-                else:
-                    # string: numeric seconds or ISO
-                    s = str(val)
-                    if s.isdigit():
-                        ts_candidate = datetime.fromtimestamp(float(s), tz=timezone.utc)
-                    else:
-                        try:
-                            ts_candidate = datetime.fromisoformat(
-                                s.replace("Z", "+00:00")
-                            )
-                        except Exception:
-                            continue
-                ts = ts_candidate
-                break
-            if not ts or ts < seven_days_ago:
+    if markup is None:
+        markup = MarkupResolver(codes)
+
+    fallback_rates = FallbackRates()
+    sales: List[NFTSale] = []
+    advanced: List[str] = []
+    for code, orders in _group_orders_by_product(results, codes).items():
+        if orders:
+            advanced.append(code)
+        for o in orders:
+            order_id = _order_id(o)
+            ts = _order_timestamp(o)
+            if not order_id or ts is None or ts < since[code]:
                 continue
-
             conv = _convert_order_to_prices(
-                o, eth_usd, usd_brl, product_code=product_code
+                o,
+                eth_usd,
+                usd_brl,
+                product_code=code,
+                markup=markup,
+                fallback_rates=fallback_rates,
             )
             if conv is None:
                 continue
-            _, _, price_brl = conv
-            sales.append((ts, price_brl))
-        except Exception:
-            continue
+            price_eth, price_usd, price_brl = conv
+            sales.append(
+                NFTSale(
+                    order_id=order_id,
+                    product_code=code,
+                    sold_at=ts,
+                    price_eth=price_eth,
+                    price_usd=price_usd,
+                    price_brl=price_brl,
+                )
+            )
+    if sales:
+        NFTSale.objects.bulk_create(sales, ignore_conflicts=True, batch_size=500)
+    if advanced:
+        # sales_synced_at is not serialized: no response cache version bump;
+        # roll_7d_sales_stats bumps it when the stats built from the ledger change
+        NFTItem.objects.filter(product_code__in=advanced).update(sales_synced_at=now)
+        marks.update((code, now) for code in advanced)
+    logger.info(
+        "sync_sales: products=%d since=%s fetched=%d stored=%d",
+        len(codes),
+        min(since.values()).isoformat(),
+        len(results),
+        len(sales),
+    )
+    return marks
 
-    sales.sort(key=lambda x: x[0])
 
-    count = len(sales)
-    volume_brl = sum((p for _, p in sales), Decimal("0")) if count else Decimal("0")
-    avg_brl = (
-        (volume_brl / count).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        if count
-        else Decimal("0")
+def sync_sales(
+    product_code: str,
+    *,
+    markup: Optional[MarkupResolver] = None,
+    now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """Single-product sync_sales_batch. Returns the new high-water mark, or the
+    previous one when Immutable could not be read completely or had no sales.
+    """
+    return sync_sales_batch([product_code], markup=markup, now=now).get(
+        str(product_code).strip()
     )
-    last_brl = sales[-1][1] if count else Decimal("0")
-    change_pct = Decimal("0")
-    if count >= 2 and sales[0][1] > 0:
-        change_pct = ((last_brl - sales[0][1]) / sales[0][1] * Decimal("100")).quantize(
-            Decimal("0.01"), rounding=ROUND_HALF_UP
-        )
 
+
+def _empty_7d_stats() -> Dict[str, Any]:
     return {
-        "seven_day_volume_brl": volume_brl,
-        "seven_day_sales_count": count,
-        "seven_day_avg_price_brl": avg_brl,
-        "seven_day_last_sale_brl": last_brl,
-        "seven_day_price_change_pct": change_pct,
-        "seven_day_updated_at": now,
+        "seven_day_volume_brl": Decimal("0"),
+        "seven_day_sales_count": 0,
+        "seven_day_avg_price_brl": Decimal("0"),
+        "seven_day_last_sale_brl": Decimal("0"),
+        "seven_day_price_change_pct": Decimal("0"),
     }
 
 
-def fetch_item_from_immutable(
-    product_code: str,
-) -> Tuple[Dict[str, Any], Optional[str]]:
-    """
-    Orchestrates fetching orders for the given product_code from Immutable,
-    picking the best order, converting prices, and mapping to NFTItem fields.
+def aggregate_7d_sales(
+    product_codes: List[str], *, now: Optional[datetime] = None
+) -> Dict[str, Dict[str, Any]]:
+    """7-day stats per product_code from the NFTSale ledger in a single grouped query.
+    Products without sales in the window get zeroed stats.
     """
-    if not product_code or not str(product_code).strip():
-        raise ValueError("product_code inválido")
+    now = now or datetime.now(timezone.utc)
+    since = now - SEVEN_DAYS
+    window = NFTSale.objects.filter(
+        product_code=OuterRef("product_code"), sold_at__gte=since
+    )
+    rows = (
+        NFTSale.objects.filter(product_code__in=product_codes, sold_at__gte=since)
+        .values("product_code")
+        .annotate(
+            count=Count("id"),
+            volume=Sum("price_brl"),
+            avg=Avg("price_brl"),
+            first=Subquery(window.order_by("sold_at", "pk").values("price_brl")[:1]),
+            last=Subquery(window.order_by("-sold_at", "-pk").values("price_brl")[:1]),
+        )
+    )
 
-    params = {
+    out = {code: _empty_7d_stats() for code in product_codes}
+    for row in rows:
+        first = Decimal(row["first"] or 0)
+        last = Decimal(row["last"] or 0)
+        change_pct = Decimal("0")
+        if row["count"] >= 2 and first > 0:
+            change_pct = ((last - first) / first * Decimal("100")).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            )
+        out[row["product_code"]] = {
+            "seven_day_volume_brl": Decimal(row["volume"] or 0),
+            "seven_day_sales_count": row["count"],
+            "seven_day_avg_price_brl": Decimal(row["avg"] or 0).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            ),
+            "seven_day_last_sale_brl": last,
+            "seven_day_price_change_pct": change_pct,
+        }
+    return out
+
+
+def fetch_7d_sales_stats(
+    product_code: str, *, markup: Optional[MarkupResolver] = None
+) -> Dict[str, Any]:
+    """
+    Compute 7-day sales stats (volume, count, avg, last sale, change %) for a product_code.
+    New filled orders are appended to the NFTSale ledger (sync_sales) and the stats
+    are aggregated from it, so only sales since the last sync are downloaded.
+    """
+    now = datetime.now(timezone.utc)
+    synced_at = sync_sales(product_code, markup=markup, now=now)
+    stats = aggregate_7d_sales([product_code], now=now)[product_code]
+    stats["seven_day_updated_at"] = now
+    if synced_at is not None:
+        stats["sales_synced_at"] = synced_at
+    return stats
+
+
+def roll_7d_sales_stats(*, now: Optional[datetime] = None) -> int:
+    """Slide the 7-day window for every item with recent sales, without calling
+    Immutable: stats are re-aggregated from the ledger so old sales drop out.
+    Returns the number of items updated.
+    """
+    now = now or datetime.now(timezone.utc)
+    # Sales that just left the window still count, so their items are zeroed out
+    recent = NFTSale.objects.filter(sold_at__gte=now - SEVEN_DAYS - timedelta(days=1))
+    items = list(
+        NFTItem.objects.filter(
+            Q(product_code__in=recent.values("product_code"))
+            | Q(seven_day_sales_count__gt=0)
+        ).only("id", "product_code")
+    )
+    if not items:
+        return 0
+    stats = aggregate_7d_sales([i.product_code for i in items], now=now)
+    fields = list(_empty_7d_stats()) + ["seven_day_updated_at"]
+    for item in items:
+        for name, value in stats[item.product_code].items():
+            setattr(item, name, value)
+        item.seven_day_updated_at = now
+    NFTItem.objects.bulk_update(items, fields, batch_size=500)
+    # bulk_update skips post_save; cached NFT list responses must still expire
+    bump_model_version_on_commit(NFTItem)
+    return len(items)
+
+
+def _active_orders_params(product_codes: List[str]) -> Dict[str, Any]:
+    return {
         "status": "active",
         # Don't fix buy token type; we'll normalize below
-        "sell_metadata": json.dumps({"productCode": [product_code]}),
+        "sell_metadata": json.dumps({"productCode": list(product_codes)}),
         "order_by": "buy_quantity",
         "direction": "asc",
         "page_size": 200,
     }
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
 
-    # Try with ordering; if fails, retry without ordering constraints
-    try_variants = [
+
+def _active_orders_variants(product_codes: List[str]) -> List[Dict[str, Any]]:
+    """Query variants tried in order: with ordering, then without ordering constraints."""
+    params = _active_orders_params(product_codes)
+    return [
         params,
         {k: v for k, v in params.items() if k not in ("order_by", "direction")},
     ]
-    results: List[Dict[str, Any]] = []
+
+
+def _fetch_active_orders(
+    product_codes: List[str], *, max_pages: int = 50
+) -> List[Dict[str, Any]]:
+    """Fetch every active order for the given product codes in a single paginated query.
+    Raises ImmutableAPIError when no query variant could be read to its last page.
+    """
+    headers = IMMUTABLE_HEADERS
     last_err: Optional[Exception] = None
-    for pp in try_variants:
+    for pp in _active_orders_variants(product_codes):
         try:
-            results = _paginate_immutable(pp, headers)
-            if results:
-                break
-            # Even if empty list, confirm the call works by doing a single page fetch
-            data = _get_json_with_retries(
-                IMMUTABLE_BASE_URL, params=pp, headers=headers, timeout=30, retries=4
-            )
-            if isinstance(data, dict):
-                results = data.get("result") or []
-                break
+            return _paginate_immutable(pp, headers, max_pages=max_pages)
+        except RateLimitTimeout:
+            # The next variant would wait for the same exhausted budget
+            raise
         except Exception as e:
             last_err = e
             continue
-    if results is None and last_err is not None:
-        logger.error("Immutable pagination error for %s: %s", product_code, last_err)
-        raise ImmutableAPIError("Erro ao consultar a Immutable") from last_err
-
-    eth_usd, usd_brl = get_current_rates()
-    best, prices = pick_best_bid_order(
-        results, eth_usd, usd_brl, product_code=product_code
-    )
-    mapped = map_order_to_item_fields(
-        best, product_code, eth_usd, usd_brl, override_prices=prices
+    logger.error(
+        "Immutable pagination error for %s: %s", ",".join(product_codes), last_err
     )
+    raise ImmutableAPIError("Erro ao consultar a Immutable") from last_err
+
 
-    # Extract possible collection contract address from the best order
-    collection_address: Optional[str] = None
+def _group_orders_by_product(
+    orders: List[Dict[str, Any]], product_codes: List[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Split a multi-product order list back into one list per requested product_code."""
+    grouped: Dict[str, List[Dict[str, Any]]] = {code: [] for code in product_codes}
+    for order in orders:
+        code = _get_prop(order, "productCode", default=None)
+        if code in grouped:
+            grouped[code].append(order)
+    return grouped
+
+
+def _extract_collection_address(order: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Extract the collection contract address from an order, if present."""
     try:
-        if best:
-            sell_data = best.get("sell", {}).get("data", {})
+        if order:
+            sell_data = order.get("sell", {}).get("data", {})
             addr = (
                 sell_data.get("token_address")
                 or sell_data.get("contract_address")
                 or sell_data.get("token_address_hex")
             )
             if not addr:
-                addr = _get_prop(best, "collectionAddress", default="")
+                addr = _get_prop(order, "collectionAddress", default="")
             if isinstance(addr, str) and addr:
-                collection_address = addr
+                return addr
     except Exception:
-        collection_address = None
+        pass
+    return None
 
-    logger.info(
-        "fetch_item: product_code=%s status=200 orders=%s eth=%s usd=%s brl=%s",
-        product_code,
-        len(results),
-        mapped.get("last_price_eth"),
-        mapped.get("last_price_usd"),
-        mapped.get("last_price_brl"),
+
+class OrderBookSnapshot:
+    """Active orders of one product, fetched once and shared by every derived price.
+
+    Both the best-bid item mapping and the minimum listing price are computed from
+    the same order list, so an upsert downloads the order book a single time.
+    """
+
+    def __init__(
+        self,
+        product_code: str,
+        orders: List[Dict[str, Any]],
+        eth_usd: Decimal,
+        usd_brl: Decimal,
+        markup: MarkupResolver,
+        fallback_rates: Optional[FallbackRates] = None,
+    ) -> None:
+        self.product_code = product_code
+        self.orders = orders
+        self.eth_usd = eth_usd
+        self.usd_brl = usd_brl
+        self.markup = markup
+        # Pass one instance to every snapshot of a batch to share it further
+        self.fallback_rates = fallback_rates or FallbackRates()
+        self.best_order_id = ""
+
+    @classmethod
+    def fetch(
+        cls, product_code: str, *, markup: Optional[MarkupResolver] = None
+    ) -> "OrderBookSnapshot":
+        """Download the active order book for product_code.
+        Raises ValueError for an empty code and ImmutableAPIError on upstream failure.
+        """
+        if not product_code or not str(product_code).strip():
+            raise ValueError("product_code inválido")
+        orders = _fetch_active_orders([product_code])
+        eth_usd, usd_brl = get_current_rates()
+        if markup is None:
+            markup = MarkupResolver([product_code])
+        return cls(product_code, orders, eth_usd, usd_brl, markup)
+
+    def item_fields(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Pick the best order and map it to NFTItem fields (plus collection address).
+        The mapped dict carries its price_fingerprint for change detection.
+        """
+        best, prices = pick_best_bid_order(
+            self.orders,
+            self.eth_usd,
+            self.usd_brl,
+            product_code=self.product_code,
+            markup=self.markup,
+            fallback_rates=self.fallback_rates,
+        )
+        mapped = map_order_to_item_fields(
+            best,
+            self.product_code,
+            self.eth_usd,
+            self.usd_brl,
+            override_prices=prices,
+            markup=self.markup,
+            fallback_rates=self.fallback_rates,
+        )
+        self.best_order_id = _order_id(best)
+        mapped["price_fingerprint"] = compute_price_fingerprint(
+            mapped, self.best_order_id
+        )
+        collection_address = _extract_collection_address(best)
+
+        logger.info(
+            "fetch_item: product_code=%s status=200 orders=%s eth=%s usd=%s brl=%s",
+            self.product_code,
+            len(self.orders),
+            mapped.get("last_price_eth"),
+            mapped.get("last_price_usd"),
+            mapped.get("last_price_brl"),
+        )
+
+        return mapped, collection_address
+
+    def listings(self) -> List[Dict[str, Any]]:
+        """Every convertible active order as a listing (prices with markup),
+        cheapest BRL first, ties broken by order id.
+        """
+        out: List[Dict[str, Any]] = []
+        for o in self.orders:
+            conv = _convert_order_to_prices(
+                o,
+                self.eth_usd,
+                self.usd_brl,
+                product_code=self.product_code,
+                markup=self.markup,
+                fallback_rates=self.fallback_rates,
+            )
+            if conv is None:
+                continue
+            price_eth, price_usd, price_brl = conv
+            sell_data = (o.get("sell") or {}).get("data") or {}
+            out.append(
+                {
+                    "id": _order_id(o),
+                    "price_eth": price_eth,
+                    "price_usd": price_usd,
+                    "price_brl": price_brl,
+                    "quantity": 1,  # generally 1 per unique NFT
+                    "expiration": _order_timestamp(o, _EXPIRATION_KEYS),
+                    "seller": o.get("user") or o.get("seller"),
+                    "token_address": sell_data.get("token_address"),
+                    "token_id": sell_data.get("token_id"),
+                }
+            )
+        out.sort(key=lambda listing: (listing["price_brl"], listing["id"]))
+        return out
+
+    def min_listing_prices(self) -> Optional[Tuple[Decimal, Decimal, Decimal]]:
+        """Minimum (eth, usd, brl) with markup across all supported orders, by BRL."""
+        best_prices: Optional[Tuple[Decimal, Decimal, Decimal]] = None
+        best_brl: Optional[Decimal] = None
+        for o in self.orders:
+            conv = _convert_order_to_prices(
+                o,
+                self.eth_usd,
+                self.usd_brl,
+                product_code=self.product_code,
+                markup=self.markup,
+                fallback_rates=self.fallback_rates,
+            )
+            if conv is None:
+                continue
+            _, _, brl = conv
+            if best_brl is None or brl < best_brl:
+                best_brl = brl
+                best_prices = conv
+        return best_prices
+
+
+def fetch_item_from_immutable(
+    product_code: str,
+    *,
+    markup: Optional[MarkupResolver] = None,
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Orchestrates fetching orders for the given product_code from Immutable,
+    picking the best order, converting prices, and mapping to NFTItem fields.
+    """
+    return OrderBookSnapshot.fetch(product_code, markup=markup).item_fields()
+
+
+# Number of product codes packed into a single sell_metadata query
+IMMUTABLE_BATCH_SIZE = 25
+
+
+def fetch_items_from_immutable(
+    product_codes: List[str],
+    *,
+    batch_size: int = IMMUTABLE_BATCH_SIZE,
+    markup: Optional[MarkupResolver] = None,
+) -> Dict[str, Tuple[Dict[str, Any], Optional[str]]]:
+    """
+    Batch variant of fetch_item_from_immutable.
+
+    Packs up to `batch_size` product codes into one `productCode` list per query,
+    paginates once per batch, then splits the orders per product and runs
+    pick_best_bid_order on each group. Returns {product_code: (mapped, collection_address)};
+    products whose batch failed or could not be read to its last page are omitted,
+    never mapped as if they had no orders.
+    """
+    codes = list(
+        dict.fromkeys(str(c).strip() for c in product_codes if c and str(c).strip())
     )
+    if not codes:
+        return {}
 
-    return mapped, collection_address
+    eth_usd, usd_brl = get_current_rates()
+    if markup is None:
+        markup = MarkupResolver(codes)
+    fallback_rates = FallbackRates()
+    out: Dict[str, Tuple[Dict[str, Any], Optional[str]]] = {}
+    for start in range(0, len(codes), max(1, batch_size)):
+        chunk = codes[start : start + max(1, batch_size)]
+        try:
+            # Larger batches hold more orders; scale the page budget accordingly
+            results = _fetch_active_orders(chunk, max_pages=50 * len(chunk))
+        except ImmutableAPIError as e:
+            logger.warning(
+                "fetch_items: batch of %d skipped (%s): %s", len(chunk), chunk[0], e
+            )
+            continue
+        grouped = _group_orders_by_product(results, chunk)
+        for code in chunk:
+            snapshot = OrderBookSnapshot(
+                code, grouped[code], eth_usd, usd_brl, markup, fallback_rates
+            )
+            out[code] = snapshot.item_fields()
+    return out
 
 
 def fetch_min_listing_prices(
     product_code: str,
+    *,
+    markup: Optional[MarkupResolver] = None,
 ) -> Optional[Tuple[Decimal, Decimal, Decimal]]:
     """Fetch all active orders and return the minimum (eth, usd, brl) with markup applied,
     mirroring frontend listing conversions.
 
-    This uses the same pagination, conversion, and pick_best_bid_order logic as
-    fetch_item_from_immutable, ensuring parity with the product page's displayed price.
+    Callers that also need the best-bid mapping should fetch an OrderBookSnapshot
+    once and use both of its methods instead of calling this and
+    fetch_item_from_immutable separately.
     """
     if not product_code or not str(product_code).strip():
         return None
 
-    params = {
-        "status": "active",
-        "sell_metadata": json.dumps({"productCode": [product_code]}),
-        "order_by": "buy_quantity",
-        "direction": "asc",
-        "page_size": 200,
-    }
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-
-    try_variants = [
-        params,
-        {k: v for k, v in params.items() if k not in ("order_by", "direction")},
-    ]
-    results: List[Dict[str, Any]] = []
-    for pp in try_variants:
-        try:
-            results = _paginate_immutable(pp, headers)
-            if results:
-                break
-            data = _get_json_with_retries(
-                IMMUTABLE_BASE_URL, params=pp, headers=headers, timeout=30, retries=4
-            )
-            if isinstance(data, dict):
-                results = data.get("result") or []
-                break
-        except Exception:
-            continue
-
-    eth_usd, usd_brl = get_current_rates()
-    # Compute minimum across all supported orders by BRL (with markup), mirroring frontend listing map
-    best_prices: Optional[Tuple[Decimal, Decimal, Decimal]] = None
-    best_brl: Optional[Decimal] = None
-    for o in results:
-        conv = _convert_order_to_prices(o, eth_usd, usd_brl, product_code=product_code)
-        if conv is None:
-            continue
-        _, _, brl = conv
-        if best_brl is None or brl < best_brl:
-            best_brl = brl
-            best_prices = conv
-    return best_prices
+    try:
+        snapshot = OrderBookSnapshot.fetch(product_code, markup=markup)
+    except ImmutableAPIError:
+        return None
+    return snapshot.min_listing_prices()
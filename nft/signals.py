@@ -0,0 +1,78 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from core.response_cache import bump_model_version_on_commit
+from gallery.models import NftCollection
+
+from . import typeahead
+from .models import NFTItem, PricingConfig
+from .services import invalidate_markup_cache
+
+# Sent after a price refresh commits, with product_codes=[...] of the rows whose
+# data actually changed (unchanged refreshes are skipped and not reported)
+prices_changed = Signal()
+
+
+@receiver(post_save, sender=PricingConfig)
+@receiver(post_delete, sender=PricingConfig)
+def pricing_config_changed(sender, **kwargs):
+    invalidate_markup_cache()
+    bump_model_version_on_commit(PricingConfig)
+
+
+@receiver(post_save, sender=NFTItem)
+def nft_item_markup_changed(sender, instance, update_fields=None, **kwargs):
+    # Price refreshes save with explicit update_fields that never touch markup
+    if update_fields is not None and "markup_percent" not in update_fields:
+        return
+    invalidate_markup_cache()
+
+
+@receiver(post_save, sender=NFTItem)
+@receiver(post_delete, sender=NFTItem)
+def nft_item_changed(sender, **kwargs):
+    bump_model_version_on_commit(NFTItem)
+
+
+@receiver(prices_changed)
+def nft_prices_changed(sender, product_codes, **kwargs):
+    # Batched refreshes write with UPDATE/bulk_update and never fire post_save
+    if product_codes:
+        bump_model_version_on_commit(NFTItem)
+
+
+@receiver(post_save, sender=NFTItem)
+def nft_item_typeahead_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not (
+        set(update_fields) & typeahead.INDEXED_ITEM_FIELDS
+    ):
+        return
+    typeahead.publish_on_commit(upserts=[typeahead.item_entry(instance)])
+
+
+@receiver(post_delete, sender=NFTItem)
+def nft_item_typeahead_deleted(sender, instance, **kwargs):
+    typeahead.publish_on_commit(removals=[typeahead.entry_ref("item", instance.pk)])
+
+
+@receiver(post_save, sender=NftCollection)
+def collection_typeahead_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not (
+        set(update_fields) & typeahead.INDEXED_COLLECTION_FIELDS
+    ):
+        return
+    typeahead.publish_on_commit(upserts=[typeahead.collection_entry(instance)])
+
+
+@receiver(post_delete, sender=NftCollection)
+def collection_typeahead_deleted(sender, instance, **kwargs):
+    typeahead.publish_on_commit(
+        removals=[typeahead.entry_ref("collection", instance.pk)]
+    )
+
+
+@receiver(prices_changed)
+def nft_prices_changed_typeahead(sender, product_codes, **kwargs):
+    # Refreshes may rename items or swap images without firing post_save
+    if product_codes:
+        typeahead.publish_items_on_commit(product_codes)
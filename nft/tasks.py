@@ -1,14 +1,40 @@
 import logging
 from celery import shared_task
-from django.utils import timezone
-from django.db import transaction
+from django.conf import settings
+from .history import rollup_price_history
+from . import typeahead
 from .models import NFTItem
-from .services import fetch_item_from_immutable, ImmutableAPIError
+from .services import (
+    fetch_item_from_immutable,
+    fetch_items_from_immutable,
+    ImmutableAPIError,
+    refresh_rates,
+    roll_7d_sales_stats,
+    sync_sales_batch,
+)
+from .scheduler import (
+    claim_due_items,
+    next_volatility,
+    recompute_refresh_intervals,
+    refresh_budget,
+)
+from .writers import (
+    FAILED,
+    NOT_FOUND,
+    PRICE_UPDATE_FIELDS,
+    UNCHANGED,
+    UPDATED,
+    PriceBatchWriter,
+)
 from random import random
 
 logger = logging.getLogger(__name__)
 
 
+# Refreshes also fold the price change into the item's volatility (nft.scheduler)
+REFRESH_UPDATE_FIELDS = PRICE_UPDATE_FIELDS + ["price_volatility"]
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def update_nft_price(self, product_code):
     """
@@ -18,17 +44,18 @@ def update_nft_price(self, product_code):
     try:
         logger.info("Iniciando atualização de preço para produto: %s", product_code)
 
-        # Busca o item no banco de dados
-        try:
-            nft_item = NFTItem.objects.get(product_code=product_code)
-        except NFTItem.DoesNotExist:
+        # Busca apenas o id, o fingerprint e o preço anterior do item no banco de dados
+        row = (
+            NFTItem.objects.filter(product_code=product_code)
+            .values_list(
+                "pk", "price_fingerprint", "last_price_eth", "price_volatility"
+            )
+            .first()
+        )
+        if row is None:
             logger.warning("Produto %s não encontrado no banco de dados", product_code)
             return {"status": "skipped", "reason": "Produto não encontrado"}
 
-        # Atualiza o timestamp de última atualização
-        nft_item.updated_at = timezone.now()
-        nft_item.save(update_fields=["updated_at"])
-
         # Busca dados atualizados da Immutable
         try:
             mapped_data, _ = fetch_item_from_immutable(product_code)
@@ -39,33 +66,22 @@ def update_nft_price(self, product_code):
             logger.error("Erro inesperado ao buscar dados para %s: %s", product_code, e)
             raise Exception(f"Erro inesperado: {e}") from e
 
-        # Atualiza os campos do item com os dados mais recentes
-        with transaction.atomic():
-            # Atualiza apenas os campos de preço e dados básicos
-            update_fields = [
-                "last_price_eth",
-                "last_price_usd",
-                "last_price_brl",
-                "name",
-                "image_url",
-                "blueprint",
-                "type",
-                "rarity",
-                "item_type",
-                "item_sub_type",
-                "product_type",
-                "material",
-                "is_crafted_item",
-                "is_craft_material",
-                "number",
-                "updated_at",
-            ]
-
-            for field in update_fields:
-                if field in mapped_data:
-                    setattr(nft_item, field, mapped_data[field])
-
-            nft_item.save(update_fields=update_fields)
+        # Atualiza os campos de preço e dados básicos (e updated_at) em um único UPDATE,
+        # ou nenhum se o fingerprint não mudou
+        pk, fingerprint, old_price, volatility = row
+        mapped_data["price_volatility"] = next_volatility(
+            old_price, mapped_data.get("last_price_eth"), volatility
+        )
+        writer = PriceBatchWriter(fields=REFRESH_UPDATE_FIELDS)
+        writer.add(product_code, mapped_data, pk=pk, fingerprint=fingerprint)
+        outcome = writer.flush().get(product_code)
+        if outcome == NOT_FOUND:
+            return {"status": "skipped", "reason": "Produto não encontrado"}
+        if outcome == UNCHANGED:
+            logger.info("Preço inalterado para %s, escrita ignorada", product_code)
+            return {"status": "unchanged", "product_code": product_code}
+        if outcome != UPDATED:
+            raise Exception("Falha ao gravar o preço atualizado")
 
         logger.info(
             "Preço atualizado com sucesso para %s: ETH=%s, USD=%s, BRL=%s",
@@ -104,54 +120,141 @@ def update_nft_price(self, product_code):
         return {"status": "failed", "product_code": product_code, "error": str(e)}
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=60, acks_late=True)
+def update_nft_prices_chunk(self, product_codes):
+    """
+    Task para atualizar um lote de NFTs com uma única consulta de ofertas à
+    Immutable (fetch_items_from_immutable) e uma única escrita no banco
+    (PriceBatchWriter), seguidas de uma consulta de vendas que anexa as vendas
+    novas do lote ao ledger NFTSale (sync_sales_batch).
+    O ritmo das chamadas é controlado pelo rate limiter compartilhado (nft.ratelimit).
+
+    Produtos que não voltaram da Immutable (lote com paginação incompleta ou com
+    erro) não são gravados: contam como falha e são tentados de novo, só eles,
+    num retry da task.
+    """
+    try:
+        pks = {
+            row[0]: row[1:]
+            for row in NFTItem.objects.filter(
+                product_code__in=product_codes
+            ).values_list(
+                "product_code",
+                "pk",
+                "price_fingerprint",
+                "last_price_eth",
+                "price_volatility",
+            )
+        }
+        if not pks:
+            return {"status": "skipped", "reason": "Nenhum produto encontrado"}
+
+        fetched = fetch_items_from_immutable(list(pks), batch_size=len(pks))
+        if not fetched:
+            raise ImmutableAPIError("Nenhum produto do lote retornou da Immutable")
+
+        writer = PriceBatchWriter(fields=REFRESH_UPDATE_FIELDS)
+        for code, (pk, fingerprint, old_price, volatility) in pks.items():
+            if code in fetched:
+                mapped_data, _ = fetched[code]
+                mapped_data["price_volatility"] = next_volatility(
+                    old_price, mapped_data.get("last_price_eth"), volatility
+                )
+                writer.add(code, mapped_data, pk=pk, fingerprint=fingerprint)
+            else:
+                writer.add_failure(code)
+        outcomes = writer.flush()
+
+        # Mantém o ledger NFTSale em dia para roll_seven_day_sales_stats, que só
+        # reagrega o que já está gravado; falhas aqui não refazem os preços
+        try:
+            sync_sales_batch(list(fetched))
+        except Exception as e:
+            logger.warning("Vendas do lote não sincronizadas: %s", e)
+
+    except Exception as e:
+        logger.error("Erro ao atualizar lote de %d produtos: %s", len(product_codes), e)
+
+        if self.request.retries < self.max_retries:
+            delay = 60 * (2**self.request.retries) + random() * 10
+            raise self.retry(countdown=delay)
+
+        return {"status": "failed", "product_codes": product_codes, "error": str(e)}
+
+    updated_count = sum(1 for o in outcomes.values() if o == UPDATED)
+    unchanged_count = sum(1 for o in outcomes.values() if o == UNCHANGED)
+    failed = [code for code, o in outcomes.items() if o == FAILED]
+    logger.info(
+        "Lote atualizado: %d de %d produtos (%d inalterados, %d com falha)",
+        updated_count,
+        len(product_codes),
+        unchanged_count,
+        len(failed),
+    )
+    if failed and self.request.retries < self.max_retries:
+        # Os já gravados não são refeitos: o retry leva apenas os que falharam
+        delay = 60 * (2**self.request.retries) + random() * 10
+        raise self.retry(args=[failed], countdown=delay)
+    return {
+        "status": "partial" if failed else "success",
+        "updated_count": updated_count,
+        "unchanged_count": unchanged_count,
+        "failed": failed,
+        "changed": writer.changed,
+        "outcomes": outcomes,
+    }
+
+
 @shared_task
 def update_all_nft_prices_nightly():
     """
     Task principal para atualizar todos os preços dos NFTs durante a madrugada.
-    Esta task agenda atualizações individuais para cada produto com intervalo de 6 segundos.
+    Percorre os product_codes em streaming (iterator) e agenda um
+    update_nft_prices_chunk por lote, sem countdown: o rate limiter compartilhado
+    define a vazão, então nenhuma mensagem fica horas atrasada no broker.
     """
     try:
         logger.info("Iniciando rotina de atualização de preços da madrugada")
 
-        # Busca todos os produtos que têm product_code válido
-        nft_items = (
+        chunk_size = getattr(settings, "NFT_REFRESH_CHUNK_SIZE", 25)
+        product_codes = (
             NFTItem.objects.filter(product_code__isnull=False)
             .exclude(product_code__exact="")
+            .order_by("pk")
             .values_list("product_code", flat=True)
+            .iterator(chunk_size=2000)
         )
 
-        total_items = len(nft_items)
-        logger.info("Total de produtos para atualizar: %d", total_items)
+        total_items = 0
+        scheduled_chunks = 0
+        chunk = []
+        for product_code in product_codes:
+            chunk.append(product_code)
+            total_items += 1
+            if len(chunk) >= chunk_size:
+                update_nft_prices_chunk.delay(chunk)
+                scheduled_chunks += 1
+                chunk = []
+        if chunk:
+            update_nft_prices_chunk.delay(chunk)
+            scheduled_chunks += 1
 
         if total_items == 0:
             logger.warning("Nenhum produto encontrado para atualização")
             return {"status": "skipped", "reason": "Nenhum produto encontrado"}
 
-        # Agenda atualizações individuais com intervalo de 6 segundos
-        scheduled_count = 0
-        for i, product_code in enumerate(nft_items):
-            # Calcula o delay: 6 segundos * índice do item
-            delay_seconds = i * 6
-
-            # Agenda a task individual
-            update_nft_price.apply_async(args=[product_code], countdown=delay_seconds)
-            scheduled_count += 1
-
-            # Log a cada 50 itens para não sobrecarregar
-            if (i + 1) % 50 == 0:
-                logger.info("Agendadas %d/%d atualizações", i + 1, total_items)
-
         logger.info(
-            "Rotina da madrugada agendada com sucesso! %d produtos serão atualizados ao longo de %.1f minutos",
-            scheduled_count,
-            scheduled_count * 6 / 60,
+            "Rotina da madrugada agendada: %d produtos em %d lotes de até %d",
+            total_items,
+            scheduled_chunks,
+            chunk_size,
         )
 
         return {
             "status": "success",
             "total_items": total_items,
-            "scheduled_count": scheduled_count,
-            "estimated_duration_minutes": scheduled_count * 6 / 60,
+            "scheduled_chunks": scheduled_chunks,
+            "chunk_size": chunk_size,
         }
 
     except Exception as e:
@@ -159,6 +262,119 @@ def update_all_nft_prices_nightly():
         return {"status": "failed", "error": str(e)}
 
 
+@shared_task
+def schedule_nft_refreshes():
+    """
+    Task do agendador adaptativo, executada pelo beat a cada minuto.
+    Reivindica os itens com next_refresh_at vencido (os mais atrasados primeiro),
+    até a fatia do limite da Immutable reservada para atualizações, e os envia
+    em lotes para update_nft_prices_chunk.
+    """
+    try:
+        chunk_size = getattr(settings, "NFT_REFRESH_CHUNK_SIZE", 25)
+        budget = refresh_budget()
+        product_codes = claim_due_items(budget)
+        for start in range(0, len(product_codes), chunk_size):
+            update_nft_prices_chunk.delay(product_codes[start : start + chunk_size])
+
+        if product_codes:
+            logger.info(
+                "Agendador: %d produtos enviados para atualização (orçamento %d)",
+                len(product_codes),
+                budget,
+            )
+        return {
+            "status": "success",
+            "scheduled_items": len(product_codes),
+            "budget": budget,
+        }
+    except Exception as e:
+        logger.error("Erro no agendador de atualizações: %s", str(e))
+        return {"status": "failed", "error": str(e)}
+
+
+@shared_task
+def recompute_nft_refresh_intervals():
+    """
+    Task para recalcular o intervalo de atualização de cada NFT a partir dos
+    acessos recentes, das vendas em 7 dias e da volatilidade do preço.
+    """
+    try:
+        changed = recompute_refresh_intervals()
+        logger.info("Intervalos de atualização recalculados: %d itens", changed)
+        return {"status": "success", "changed": changed}
+    except Exception as e:
+        logger.error("Erro ao recalcular intervalos de atualização: %s", str(e))
+        return {"status": "failed", "error": str(e)}
+
+
+@shared_task(ignore_result=True)
+def refresh_fx_rates():
+    """
+    Task para atualizar as cotações ETH/USD e USD/BRL em background.
+    Executada pelo beat antes do TTL expirar e sob demanda quando um leitor encontra
+    cotações vencidas, para que get_current_rates nunca espere pelas APIs externas.
+    """
+    try:
+        eth_usd, usd_brl = refresh_rates()
+        logger.info("Cotações atualizadas: ETH/USD=%s USD/BRL=%s", eth_usd, usd_brl)
+        return {"status": "success", "eth_usd": str(eth_usd), "usd_brl": str(usd_brl)}
+    except Exception as e:
+        logger.error("Erro ao atualizar cotações: %s", str(e))
+        return {"status": "failed", "error": str(e)}
+
+
+@shared_task
+def roll_seven_day_sales_stats():
+    """
+    Task para deslizar a janela de 7 dias das métricas de venda.
+    Reagrega as métricas a partir do ledger NFTSale (sem chamar a Immutable),
+    para que vendas antigas saiam das estatísticas mesmo sem novas vendas.
+    """
+    try:
+        updated = roll_7d_sales_stats()
+        logger.info("Métricas de 7 dias recalculadas para %d itens", updated)
+        return {"status": "success", "updated": updated}
+    except Exception as e:
+        logger.error("Erro ao recalcular métricas de 7 dias: %s", str(e))
+        return {"status": "failed", "error": str(e)}
+
+
+@shared_task
+def rollup_nft_price_history():
+    """
+    Task para compactar o histórico de preços: observações brutas antigas viram
+    médias por hora e, depois, por dia (limites em NFT_PRICE_HISTORY).
+    """
+    try:
+        result = rollup_price_history()
+        logger.info(
+            "Histórico compactado: %d buckets por hora, %d por dia",
+            result["hourly"],
+            result["daily"],
+        )
+        return {"status": "success", **result}
+    except Exception as e:
+        logger.error("Erro ao compactar histórico de preços: %s", str(e))
+        return {"status": "failed", "error": str(e)}
+
+
+@shared_task
+def rebuild_typeahead_index():
+    """
+    Task para reconstruir o snapshot compartilhado do autocomplete a partir do
+    banco. As alterações do dia a dia chegam aos workers como deltas; o snapshot
+    cobre partidas a frio e deltas perdidos por expiração do cache.
+    """
+    try:
+        entries = typeahead.rebuild()
+        logger.info("Índice de autocomplete reconstruído com %d entradas", entries)
+        return {"status": "success", "entries": entries}
+    except Exception as e:
+        logger.error("Erro ao reconstruir índice de autocomplete: %s", str(e))
+        return {"status": "failed", "error": str(e)}
+
+
 @shared_task
 def cleanup_old_price_updates():
     """
@@ -0,0 +1,312 @@
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from gallery.models import NftCollection
+
+from .exceptions import RateLimitTimeout
+from .models import NFTItem, NFTItemAccess, NFTPriceObservation
+from .ratelimit import acquire, request_wait
+from .scheduler import recompute_refresh_intervals, refresh_budget
+from .services import _get_json_with_retries
+from .writers import PRICE_UPDATE_FIELDS, UNCHANGED, UPDATED, PriceBatchWriter
+
+
+class NFTListQueryCountTests(TestCase):
+    """The item list and trending endpoints run a fixed number of queries,
+    whatever the number of items and collections on the page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        collections = [
+            NftCollection.objects.create(
+                name=f"Coleção {i}", slug=f"colecao-{i}", address=f"0x{i:040x}"
+            )
+            for i in range(3)
+        ]
+        for i in range(12):
+            item = NFTItem.objects.create(
+                name=f"Item {i}",
+                name_pt_br=f"Item pt {i}",
+                type="skin",
+                product_code=f"code_{i}",
+                rarity="rare" if i % 2 else "common",
+                last_price_brl=Decimal(10 + i),
+                collection=collections[i % 3],
+            )
+            for _ in range(i % 4):
+                NFTItemAccess.objects.create(item=item)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def assertQueries(self, expected, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            len(ctx.captured_queries),
+            expected,
+            "\n".join(q["sql"] for q in ctx.captured_queries),
+        )
+        return response
+
+    def test_list_page_number(self):
+        # COUNT(*) + the page, collection columns joined in the same query
+        response = self.assertQueries(2, "/nft/items/")
+        self.assertEqual(response.data["count"], 12)
+        self.assertEqual(len(response.data["results"]), 12)
+        self.assertTrue(response.data["results"][0]["collection_slug"])
+
+    def test_list_page_number_card_profile(self):
+        response = self.assertQueries(2, "/nft/items/", {"profile": "card"})
+        first = response.data["results"][0]
+        self.assertIn("collection_name", first)
+        self.assertNotIn("last_price_eth", first)
+
+    def test_list_cursor(self):
+        # Keyset pages skip the COUNT(*)
+        response = self.assertQueries(
+            1, "/nft/items/", {"pagination": "cursor", "page_size": 5}
+        )
+        self.assertEqual(len(response.data["results"]), 5)
+        next_params = parse_qs(urlsplit(response.data["next"]).query)
+        self.assertQueries(1, "/nft/items/", {k: v[0] for k, v in next_params.items()})
+
+    def test_list_cursor_card_profile(self):
+        response = self.assertQueries(
+            1,
+            "/nft/items/",
+            {"pagination": "cursor", "page_size": 5, "profile": "card"},
+        )
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_list_filtered_by_collection(self):
+        self.assertQueries(2, "/nft/items/", {"collection_slug": "colecao-1"})
+
+    def test_list_with_shared_cache(self):
+        # Shared cache: one ETag aggregate, then COUNT(*) + page on a miss only
+        with tempfile.TemporaryDirectory() as location:
+            shared = {
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": location,
+                }
+            }
+            with override_settings(CACHES=shared):
+                cache.clear()
+                response = self.assertQueries(3, "/nft/items/", {"profile": "card"})
+                self.assertQueries(1, "/nft/items/", {"profile": "card"})
+                with CaptureQueriesContext(connection) as ctx:
+                    not_modified = self.client.get(
+                        "/nft/items/",
+                        {"profile": "card"},
+                        HTTP_IF_NONE_MATCH=response["ETag"],
+                    )
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_trending(self):
+        response = self.assertQueries(1, "/nft/trending/", {"limit": 8})
+        self.assertEqual(len(response.data["results"]), 8)
+        self.assertTrue(response.data["results"][0]["collection_name"])
+
+    def test_trending_card_profile(self):
+        response = self.assertQueries(
+            1, "/nft/trending/", {"limit": 8, "profile": "card"}
+        )
+        self.assertNotIn("last_price_eth", response.data["results"][0])
+
+
+def mapped_item(fingerprint, volatility):
+    return {
+        "name": "Item",
+        "type": "skin",
+        "blueprint": "",
+        "image_url": "",
+        "rarity": "",
+        "item_type": "",
+        "item_sub_type": "",
+        "product_type": "",
+        "material": "",
+        "is_crafted_item": False,
+        "is_craft_material": False,
+        "number": None,
+        "last_price_eth": Decimal("1"),
+        "last_price_usd": Decimal("1"),
+        "last_price_brl": Decimal("1"),
+        "price_fingerprint": fingerprint,
+        "price_volatility": volatility,
+    }
+
+
+class PriceBatchWriterTests(TestCase):
+    FIELDS = PRICE_UPDATE_FIELDS + ["price_volatility"]
+
+    def setUp(self):
+        self.item = NFTItem.objects.create(
+            name="Item",
+            type="skin",
+            product_code="code_w",
+            last_price_eth=Decimal("1"),
+            price_fingerprint="fp",
+            price_volatility=0.5,
+        )
+
+    def flush(self, fingerprint, volatility):
+        writer = PriceBatchWriter(fields=self.FIELDS)
+        writer.add(
+            "code_w",
+            mapped_item(fingerprint, volatility),
+            pk=self.item.pk,
+            fingerprint="fp",
+        )
+        return writer.flush()["code_w"]
+
+    def test_unchanged_row_keeps_updated_at(self):
+        before = self.item.updated_at
+        self.assertEqual(self.flush("fp", 0.25), UNCHANGED)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.updated_at, before)
+        # The decayed volatility is still stored
+        self.assertEqual(self.item.price_volatility, 0.25)
+        self.assertFalse(NFTPriceObservation.objects.exists())
+
+    def test_changed_row_is_written(self):
+        before = self.item.updated_at
+        self.assertEqual(self.flush("other", 0.25), UPDATED)
+        self.item.refresh_from_db()
+        self.assertGreater(self.item.updated_at, before)
+        self.assertEqual(self.item.price_fingerprint, "other")
+
+
+class RefreshIntervalTests(TestCase):
+    def test_recompute_moves_next_refresh_from_last_claim(self):
+        now = timezone.now()
+        claimed_at = now - timedelta(hours=1)
+        item = NFTItem.objects.create(
+            name="Item",
+            type="skin",
+            product_code="code_s",
+            refresh_interval_seconds=86400,
+            next_refresh_at=claimed_at + timedelta(seconds=86400),
+        )
+        # A hot item: 100 views in the window shrink the interval to the minimum
+        NFTItemAccess.objects.bulk_create(NFTItemAccess(item=item) for _ in range(100))
+        self.assertEqual(recompute_refresh_intervals(now=now), 1)
+        item.refresh_from_db()
+        self.assertLess(item.refresh_interval_seconds, 86400)
+        self.assertEqual(
+            item.next_refresh_at,
+            claimed_at + timedelta(seconds=item.refresh_interval_seconds),
+        )
+
+    @override_settings(
+        UPSTREAM_RATE_LIMITS={"api.x.immutable.com": {"rate": 5, "period": 1.0}},
+        NFT_REFRESH_CHUNK_SIZE=25,
+        NFT_ADAPTIVE_REFRESH={"budget_share": 0.5},
+    )
+    def test_budget_counts_orders_and_sales_queries_per_chunk(self):
+        # 5 req/s * 60s * 0.5 = 150 requests; each chunk spends 2 of them
+        self.assertEqual(refresh_budget(tick_seconds=60), 75 * 25)
+
+
+class NFTItemUpsertAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        collection = NftCollection.objects.create(
+            name="Coleção", slug="colecao", address=f"0x{1:040x}"
+        )
+        self.mapped = {
+            **mapped_item("fp", 0.0),
+            "product_code": "code_u",
+        }
+        self.order_book = mock.Mock()
+        self.order_book.item_fields.side_effect = lambda: (
+            dict(self.mapped),
+            collection.address,
+        )
+        self.order_book.min_listing_prices.return_value = None
+
+    def upsert(self):
+        with (
+            mock.patch(
+                "nft.views.OrderBookSnapshot.fetch", return_value=self.order_book
+            ),
+            mock.patch("nft.views.fetch_7d_sales_stats", return_value={}),
+        ):
+            return self.client.post("/nft/", {"product_code": "code_u"}, format="json")
+
+    def test_history_only_on_price_change(self):
+        self.assertEqual(self.upsert().status_code, 201)
+        self.assertEqual(self.upsert().status_code, 200)
+        self.assertEqual(NFTPriceObservation.objects.count(), 1)
+        self.mapped["price_fingerprint"] = "fp2"
+        self.upsert()
+        self.assertEqual(NFTPriceObservation.objects.count(), 2)
+
+
+class NFTListingsAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_unknown_product_code_is_not_fetched(self):
+        with mock.patch("nft.views.OrderBookSnapshot.fetch") as fetch:
+            response = self.client.get("/nft/items/unknown_code/listings/")
+        self.assertEqual(response.status_code, 404)
+        fetch.assert_not_called()
+
+    def test_if_none_match_list(self):
+        NFTItem.objects.create(name="Item", type="skin", product_code="code_l")
+        with mock.patch("nft.views.OrderBookSnapshot.fetch") as fetch:
+            fetch.return_value.listings.return_value = []
+            response = self.client.get("/nft/items/code_l/listings/")
+            etag = response["ETag"]
+            not_modified = self.client.get(
+                "/nft/items/code_l/listings/",
+                HTTP_IF_NONE_MATCH=f'"other", W/{etag}',
+            )
+            # A substring of the ETag is not a match
+            modified = self.client.get(
+                "/nft/items/code_l/listings/", HTTP_IF_NONE_MATCH=etag[1:-2]
+            )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(modified.status_code, 200)
+
+
+class RateLimitTests(TestCase):
+    HOST = "api.x.immutable.com"
+
+    def setUp(self):
+        cache.clear()
+
+    def test_request_wait_caps_the_token_wait(self):
+        limits = {self.HOST: {"rate": 1, "period": 60.0}}
+        with override_settings(
+            UPSTREAM_RATE_LIMITS=limits, UPSTREAM_RATE_LIMIT_REQUEST_MAX_WAIT=0
+        ):
+            acquire(self.HOST)
+            with mock.patch("nft.ratelimit.time.sleep") as sleep:
+                with request_wait(), self.assertRaises(RateLimitTimeout):
+                    acquire(self.HOST)
+            sleep.assert_not_called()
+
+    def test_rate_limit_timeout_is_not_retried(self):
+        session = mock.Mock()
+        session.get.side_effect = RateLimitTimeout("budget exhausted")
+        with mock.patch("nft.services.get_session", return_value=session):
+            with self.assertRaises(RateLimitTimeout):
+                _get_json_with_retries(f"https://{self.HOST}/v3/orders", retries=4)
+        self.assertEqual(session.get.call_count, 1)
@@ -0,0 +1,359 @@
+"""Prefix autocomplete over NFT items and collections.
+
+Each process keeps a PrefixIndex in memory: a sorted array of normalized keys
+(every word-suffix of name, name_pt_br, product_code and collection names,
+accent- and case-folded) searched with bisect. It is a flattened trie, so a
+lookup is a binary search plus a short scan and never touches the database.
+
+Workers share the index through the Django cache (Redis in production):
+- a compressed snapshot of every entry, rebuilt periodically from the database
+  by nft.tasks.rebuild_typeahead_index;
+- a sequence of small deltas (upserts/removals) published after commit by the
+  signal receivers in nft.signals.
+
+Every NFT_TYPEAHEAD_SYNC_SECONDS a process applies the deltas it has not seen
+yet, so writes show up everywhere within that delay without a full rebuild. The
+database is only read on a cold start (no snapshot in the cache yet) or when
+deltas were lost to eviction. Without a shared cache (no CACHE_URL) deltas never
+leave the process that published them, so each process instead reloads its
+index from the database every _LOCAL_RELOAD_SECONDS.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.response_cache import cache_is_shared
+from gallery.models import NftCollection
+
+from .models import NFTItem
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = "nft:typeahead"
+_SNAPSHOT_KEY = f"{_PREFIX}:snapshot"
+_SEQ_KEY = f"{_PREFIX}:seq"
+_REBUILD_LOCK_KEY = f"{_PREFIX}:rebuild-lock"
+# Deltas only need to outlive the periodic snapshot rebuild
+_DELTA_TTL = 60 * 60 * 24
+# Deltas applied per sync; a process far behind catches up over several syncs
+_MAX_PENDING_DELTAS = 1000
+# A delta missing for longer than this was evicted, not just published late
+_GAP_GRACE_SECONDS = 5.0
+# Reload period of a process-local index (cache not shared between processes)
+_LOCAL_RELOAD_SECONDS = 300
+# Keys scanned per requested result before ranking
+_SCAN_FACTOR = 25
+
+_ITEM_FIELDS = ("id", "name", "name_pt_br", "product_code", "image_url")
+_COLLECTION_FIELDS = ("id", "name", "slug", "profile_image")
+# post_save with update_fields outside these cannot change an entry
+INDEXED_ITEM_FIELDS = frozenset(_ITEM_FIELDS)
+INDEXED_COLLECTION_FIELDS = frozenset(_COLLECTION_FIELDS)
+
+
+def _sync_seconds() -> float:
+    return float(getattr(settings, "NFT_TYPEAHEAD_SYNC_SECONDS", 1.0))
+
+
+def normalize(text: Optional[str]) -> str:
+    """Case- and accent-folded words separated by single spaces."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    # "_" separates words too, so "nft_cf25" is found by "cf25"
+    return " ".join(re.findall(r"[^\W_]+", text))
+
+
+def _word_suffixes(text: Optional[str]) -> List[str]:
+    words = normalize(text).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def item_entry(item: Any) -> Dict[str, Any]:
+    return {
+        "type": "item",
+        "id": item.pk,
+        "label": item.name or item.product_code or "",
+        "name_pt_br": item.name_pt_br or "",
+        "product_code": item.product_code or "",
+        "image_url": item.image_url or "",
+    }
+
+
+def collection_entry(collection: Any) -> Dict[str, Any]:
+    return {
+        "type": "collection",
+        "id": collection.pk,
+        "label": collection.name or "",
+        "slug": collection.slug or "",
+        "image_url": collection.profile_image or "",
+    }
+
+
+def entry_ref(kind: str, pk: Any) -> str:
+    return f"{kind}:{pk}"
+
+
+def _ref(entry: Dict[str, Any]) -> str:
+    return entry_ref(entry["type"], entry["id"])
+
+
+def _entry_keys(entry: Dict[str, Any]) -> List[Tuple[str, int, str]]:
+    ref = _ref(entry)
+    texts = [entry["label"]]
+    if entry["type"] == "item":
+        texts += [entry["name_pt_br"], entry["product_code"]]
+    keys = set()
+    for text in texts:
+        for offset, key in enumerate(_word_suffixes(text)):
+            keys.add((key, offset, ref))
+    return sorted(keys)
+
+
+class PrefixIndex:
+    """Sorted (key, word_offset, ref) array over the typeahead entries."""
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        keys: List[Tuple[str, int, str]] = []
+        for entry in entries:
+            self.entries[_ref(entry)] = entry
+            keys.extend(_entry_keys(entry))
+        keys.sort()
+        self._keys = keys
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def remove(self, ref: str) -> None:
+        entry = self.entries.pop(ref, None)
+        if entry is None:
+            return
+        for key in _entry_keys(entry):
+            i = bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                del self._keys[i]
+
+    def upsert(self, entry: Dict[str, Any]) -> None:
+        self.remove(_ref(entry))
+        self.entries[_ref(entry)] = entry
+        for key in _entry_keys(entry):
+            insort(self._keys, key)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Entries with a key starting with query: exact keys first, then
+        matches at the start of the text, then shorter labels.
+        """
+        prefix = normalize(query)
+        if not prefix or limit <= 0:
+            return []
+        best: Dict[str, Tuple[Any, ...]] = {}
+        i = bisect_left(self._keys, (prefix,))
+        end = min(len(self._keys), i + limit * _SCAN_FACTOR)
+        while i < end:
+            key, offset, ref = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            label = self.entries[ref]["label"]
+            score = (key != prefix, offset, len(label), label, ref)
+            if ref not in best or score < best[ref]:
+                best[ref] = score
+            i += 1
+        ranked = sorted(best.items(), key=lambda kv: kv[1])[:limit]
+        return [self.entries[ref] for ref, _ in ranked]
+
+
+# ---------------------------------------------------------------------------
+# Shared state (cache) and write path
+# ---------------------------------------------------------------------------
+
+
+def _delta_key(seq: int) -> str:
+    return f"{_PREFIX}:delta:{seq}"
+
+
+def _current_seq() -> int:
+    return int(cache.get(_SEQ_KEY) or 0)
+
+
+def load_entries() -> List[Dict[str, Any]]:
+    """Every typeahead entry, read from the database."""
+    entries = [
+        item_entry(item)
+        for item in NFTItem.objects.only(*_ITEM_FIELDS)
+        .order_by()
+        .iterator(chunk_size=2000)
+    ]
+    entries += [
+        collection_entry(c)
+        for c in NftCollection.objects.only(*_COLLECTION_FIELDS).order_by()
+    ]
+    return entries
+
+
+def rebuild() -> int:
+    """Rebuild the shared snapshot from the database; returns the entry count."""
+    # Read the sequence first: deltas published while the query runs are
+    # re-applied on top of the snapshot, which is harmless since they are ordered
+    seq = _current_seq()
+    entries = load_entries()
+    payload = {"seq": seq, "entries": entries}
+    blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+    cache.set(_SNAPSHOT_KEY, blob, None)
+    return len(entries)
+
+
+def _read_snapshot() -> Optional[Dict[str, Any]]:
+    blob = cache.get(_SNAPSHOT_KEY)
+    if blob is None:
+        return None
+    try:
+        return json.loads(zlib.decompress(blob))
+    except (zlib.error, ValueError) as e:
+        logger.warning("typeahead snapshot unreadable: %s", e)
+        return None
+
+
+def publish(
+    upserts: Iterable[Dict[str, Any]] = (), removals: Iterable[str] = ()
+) -> None:
+    """Append a delta for every process to apply; call after commit."""
+    delta = {"upsert": list(upserts), "remove": list(removals)}
+    if not delta["upsert"] and not delta["remove"]:
+        return
+    try:
+        try:
+            seq = cache.incr(_SEQ_KEY)
+        except ValueError:
+            cache.add(_SEQ_KEY, 0, None)
+            seq = cache.incr(_SEQ_KEY)
+        cache.set(_delta_key(seq), delta, _DELTA_TTL)
+    except Exception as e:
+        logger.warning("typeahead delta not published: %s", e)
+
+
+def publish_on_commit(
+    upserts: Iterable[Dict[str, Any]] = (), removals: Iterable[str] = ()
+) -> None:
+    upserts, removals = list(upserts), list(removals)
+    transaction.on_commit(lambda: publish(upserts, removals))
+
+
+def publish_items_on_commit(product_codes: Iterable[str]) -> None:
+    """Re-publish items written without post_save (batched price refreshes)."""
+    codes = list(product_codes)
+
+    def run():
+        items = NFTItem.objects.filter(product_code__in=codes).only(*_ITEM_FIELDS)
+        publish(item_entry(item) for item in items)
+
+    transaction.on_commit(run)
+
+
+# ---------------------------------------------------------------------------
+# Per-process index
+# ---------------------------------------------------------------------------
+
+
+class _LocalState:
+    def __init__(self):
+        self.index: Optional[PrefixIndex] = None
+        self.seq = 0
+        self.checked = float("-inf")
+        self.loaded = float("-inf")
+        self.gap_since: Optional[float] = None
+
+
+_state = _LocalState()
+_lock = threading.Lock()
+
+
+def _load(now: float, rebuild_first: bool = False) -> None:
+    snapshot = None if rebuild_first else _read_snapshot()
+    if snapshot is None:
+        # Cold start or lost deltas: one process rebuilds, the others keep
+        # serving what they have and pick the snapshot up on a later sync
+        try:
+            leader = cache.add(_REBUILD_LOCK_KEY, 1, 60)
+        except Exception:
+            leader = True
+        if not leader:
+            return
+        try:
+            rebuild()
+        finally:
+            cache.delete(_REBUILD_LOCK_KEY)
+        snapshot = _read_snapshot()
+        if snapshot is None:
+            return
+    _state.index = PrefixIndex(snapshot["entries"])
+    _state.loaded = now
+    _state.seq = snapshot["seq"]
+    _state.gap_since = None
+    _apply_deltas(now)
+
+
+def _apply_deltas(now: float) -> None:
+    latest = min(_current_seq(), _state.seq + _MAX_PENDING_DELTAS)
+    if latest <= _state.seq:
+        return
+    wanted = range(_state.seq + 1, latest + 1)
+    deltas = cache.get_many([_delta_key(seq) for seq in wanted])
+    for seq in wanted:
+        delta = deltas.get(_delta_key(seq))
+        if delta is None:
+            # Published but not stored yet, or evicted: wait a little, then
+            # reload, rebuilding when the snapshot predates the missing delta
+            if _state.gap_since is None:
+                _state.gap_since = now
+            elif now - _state.gap_since > _GAP_GRACE_SECONDS:
+                snapshot_seq = (_read_snapshot() or {}).get("seq", -1)
+                _load(now, rebuild_first=snapshot_seq < seq)
+            return
+        for ref in delta["remove"]:
+            _state.index.remove(ref)
+        for entry in delta["upsert"]:
+            _state.index.upsert(entry)
+        _state.seq = seq
+        _state.gap_since = None
+
+
+def get_index() -> PrefixIndex:
+    """This process's index, synced with the shared deltas at most every
+    NFT_TYPEAHEAD_SYNC_SECONDS.
+    """
+    now = time.monotonic()
+    if _state.index is not None and now - _state.checked < _sync_seconds():
+        return _state.index
+    with _lock:
+        if _state.index is None or now - _state.checked >= _sync_seconds():
+            try:
+                if _state.index is None:
+                    _load(now)
+                elif (
+                    not cache_is_shared()
+                    and now - _state.loaded >= _LOCAL_RELOAD_SECONDS
+                ):
+                    _load(now, rebuild_first=True)
+                else:
+                    _apply_deltas(now)
+            except Exception as e:
+                logger.warning("typeahead sync failed: %s", e)
+            _state.checked = now
+    return _state.index or PrefixIndex()
+
+
+def search(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    return get_index().search(query, limit)
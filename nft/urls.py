@@ -5,15 +5,34 @@ from .views import (
     NFTItemListAPI,
     TrendingByAccessAPI,
     PricingConfigAPI,
+    NFTPriceHistoryAPI,
+    NFTItemListingsAPI,
+    NFTTypeaheadAPI,
+    NFTItemFacetsAPI,
 )
 from .record_access_view import RecordNFTAccessAPI
 
-
 urlpatterns = [
     # POST upsert by product_code
     path("nft/", NFTItemUpsertAPI.as_view(), name="nft-items-upsert"),
     # GET list with filters/search/order/pagination
     path("nft/items/", NFTItemListAPI.as_view(), name="nft-items-list"),
+    # GET counts per filter value under the current filters (sidebar facets)
+    path("nft/items/facets/", NFTItemFacetsAPI.as_view(), name="nft-items-facets"),
+    # GET price history for charts (?start=&end=&interval=hour|day)
+    path(
+        "nft/items/<str:product_code>/history/",
+        NFTPriceHistoryAPI.as_view(),
+        name="nft-items-price-history",
+    ),
+    # GET active listings converted with markup (cursor-paginated, ETag)
+    path(
+        "nft/items/<str:product_code>/listings/",
+        NFTItemListingsAPI.as_view(),
+        name="nft-items-listings",
+    ),
+    # GET prefix autocomplete over items and collections (?q=&limit=)
+    path("nft/typeahead/", NFTTypeaheadAPI.as_view(), name="nft-typeahead"),
     # POST record access to an item
     path("nft/items/view/", RecordNFTAccessAPI.as_view(), name="nft-items-record-view"),
     # GET top by access (last N days), default limit=4
@@ -2,8 +2,21 @@ from rest_framework import permissions, status, generics, filters as drf_filters
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .docs import nft_item_upsert_schema, nft_item_list_schema
+from .docs import (
+    nft_item_upsert_schema,
+    nft_item_list_schema,
+    nft_price_history_schema,
+    nft_listings_schema,
+    nft_typeahead_schema,
+    nft_item_facets_schema,
+)
+
+import base64
+import hashlib
+import json
+from decimal import Decimal
 
+from django.conf import settings
 from django.db.models import Count, Max
 from django.utils import timezone
 from datetime import timedelta
@@ -12,16 +25,31 @@ from .serializers import (
     NFTItemSerializer,
     FetchByProductCodeSerializer,
     PricingConfigSerializer,
+    PriceHistoryQuerySerializer,
+    PricePointSerializer,
+    ListingQuerySerializer,
+    ListingSerializer,
+    TypeaheadQuerySerializer,
+    TypeaheadEntrySerializer,
 )
 from .services import (
-    fetch_item_from_immutable,
     ImmutableAPIError,
+    compute_price_fingerprint,
     fetch_7d_sales_stats,
-    fetch_min_listing_prices,
+    MarkupResolver,
+    OrderBookSnapshot,
 )
 from rest_framework.permissions import AllowAny
+from .facets import facet_counts, strip_facet_params
 from .filters import NFTItemFilter
+from .history import price_history, record_price_observations
+from .pagination import KeysetPagination
+from .ratelimit import request_wait
+from . import typeahead
+from .search import NFTItemSearchFilter, is_ranked
 from gallery.models import NftCollection
+from core.conditional import conditional_get, etag_matches
+from core.response_cache import cache_response
 
 
 class IsAuthenticatedOrReadOnly(permissions.IsAuthenticatedOrReadOnly):
@@ -32,13 +60,18 @@ class NFTItemUpsertAPI(APIView):
     permission_classes = [AllowAny]
 
     @nft_item_upsert_schema
+    @request_wait()
     def post(self, request):
         serializer = FetchByProductCodeSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         product_code = serializer.validated_data["product_code"]
+        # Resolve markup once for every conversion done in this request
+        markup = MarkupResolver([product_code])
 
         try:
-            mapped, collection_address = fetch_item_from_immutable(product_code)
+            # Download the active order book once; best bid and min listing derive from it
+            order_book = OrderBookSnapshot.fetch(product_code, markup=markup)
+            mapped, collection_address = order_book.item_fields()
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except ImmutableAPIError:
@@ -55,7 +88,7 @@ class NFTItemUpsertAPI(APIView):
         # Resolve the collection: by contract address if available, or from existing item
         existing_item = (
             NFTItem.objects.filter(product_code=product_code)
-            .only("id", "collection_id")
+            .only("id", "collection_id", "price_fingerprint")
             .first()
         )
         collection_obj = None
@@ -84,13 +117,13 @@ class NFTItemUpsertAPI(APIView):
 
         # Compute 7d sales metrics (best-effort)
         try:
-            seven_d = fetch_7d_sales_stats(product_code)
+            seven_d = fetch_7d_sales_stats(product_code, markup=markup)
         except Exception:
             seven_d = {}
 
         # Ensure the saved price matches the product page display logic (minimum listing)
         try:
-            min_prices = fetch_min_listing_prices(product_code)
+            min_prices = order_book.min_listing_prices()
         except Exception:
             min_prices = None
 
@@ -100,6 +133,10 @@ class NFTItemUpsertAPI(APIView):
             mapped["last_price_eth"] = pe
             mapped["last_price_usd"] = pu
             mapped["last_price_brl"] = pb
+            # Fingerprint what is actually stored so later refreshes compare like with like
+            mapped["price_fingerprint"] = compute_price_fingerprint(
+                mapped, order_book.best_order_id
+            )
 
         # Proceed with upsert, binding collection and 7d metrics
         defaults = {**mapped, **seven_d, "collection": collection_obj}
@@ -107,6 +144,12 @@ class NFTItemUpsertAPI(APIView):
             product_code=product_code,
             defaults=defaults,
         )
+        # History only on a price change, as PriceBatchWriter does for refreshes
+        if (
+            existing_item is None
+            or existing_item.price_fingerprint != mapped["price_fingerprint"]
+        ):
+            record_price_observations([(obj.pk, mapped)], observed_at=obj.updated_at)
         out = NFTItemSerializer(obj)
         return Response(
             out.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
@@ -114,17 +157,19 @@ class NFTItemUpsertAPI(APIView):
 
 
 class NFTItemListAPI(generics.ListAPIView):
-    queryset = NFTItem.objects.all()
+    # One query per page: collection slug/name come from the same JOIN
+    queryset = NFTItemSerializer.optimize_queryset(NFTItem.objects.all())
     serializer_class = NFTItemSerializer
     permission_classes = [AllowAny]
     filterset_class = NFTItemFilter
     # Enable filtering, search and ordering backends
     filter_backends = [
         DjangoFilterBackend,
-        drf_filters.SearchFilter,
+        NFTItemSearchFilter,
         drf_filters.OrderingFilter,
     ]
-    # Include both English (name) and Portuguese (name_pt_br) for search
+    # Include both English (name) and Portuguese (name_pt_br) for search;
+    # on PostgreSQL these are served by the full-text and trigram indexes
     search_fields = ["name", "name_pt_br", "product_code"]
     ordering_fields = [
         "name",
@@ -142,12 +187,43 @@ class NFTItemListAPI(generics.ListAPIView):
         "seven_day_price_change_pct",
     ]
 
+    @property
+    def paginator(self):
+        # Opt-in keyset pagination (?pagination=cursor, or any ?cursor=) for infinite scroll
+        params = self.request.query_params
+        # Relevance-ranked search is not keyset-orderable and keeps page numbers
+        if (
+            not hasattr(self, "_paginator")
+            and (params.get("pagination") == "cursor" or "cursor" in params)
+            and not is_ranked(self.request)
+        ):
+            self._paginator = KeysetPagination()
+        return super().paginator
+
     @nft_item_list_schema
+    @conditional_get(NFTItem, NftCollection, PricingConfig)
+    @cache_response(NFTItem, NftCollection, PricingConfig)
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    def get_etag_queryset(self, request, *args, **kwargs):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", NFTItemSerializer.requested_fields(self.request))
+        return super().get_serializer(*args, **kwargs)
+
     def get_queryset(self):
         qs = super().get_queryset()
+        fields = NFTItemSerializer.requested_fields(self.request)
+        if fields is not None:
+            # Narrow the SELECT too; ordering columns stay loaded for keyset cursors
+            ordering = drf_filters.OrderingFilter().get_ordering(
+                self.request, qs, self
+            ) or list(NFTItem._meta.ordering)
+            qs = NFTItemSerializer.optimize_queryset(
+                qs, fields, [term.lstrip("-") for term in ordering]
+            )
         # Hard-enforce promo_only even if filters are misconfigured on some environments
         val = self.request.query_params.get("promo_only")
         truthy = {"1", "true", "t", "yes", "y", "on"}
@@ -173,6 +249,32 @@ class NFTItemListAPI(generics.ListAPIView):
         return qs
 
 
+class NFTItemFacetsAPI(APIView):
+    """
+    Contagens por valor de cada filtro do catálogo (rarity, item_type,
+    item_sub_type, material, source, collection) sob os filtros atuais, em uma
+    única consulta agrupada; a resposta fica no cache por assinatura de filtros.
+    """
+
+    permission_classes = [AllowAny]
+    # Same search semantics as the list (read by NFTItemSearchFilter)
+    search_fields = NFTItemListAPI.search_fields
+
+    @nft_item_facets_schema
+    @cache_response(NFTItem, NftCollection, PricingConfig)
+    def get(self, request):
+        queryset = NFTItem.objects.all()
+        # Validate every param like the list does, then filter without the facets
+        full = NFTItemFilter(data=request.query_params, queryset=queryset)
+        if not full.is_valid():
+            return Response(full.errors, status=status.HTTP_400_BAD_REQUEST)
+        others = NFTItemFilter(
+            data=strip_facet_params(request.query_params), queryset=queryset
+        )
+        queryset = NFTItemSearchFilter().filter_queryset(request, others.qs, self)
+        return Response(facet_counts(queryset, request.query_params))
+
+
 class PricingConfigAPI(APIView):
     """
     API para obter a configuração de markup global
@@ -232,18 +334,163 @@ class TrendingByAccessAPI(APIView):
         days = int(request.query_params.get("days", 7))
         cutoff = timezone.now() - timedelta(days=days)
 
+        fields = NFTItemSerializer.requested_fields(request)
+
         # Get top items by access count in the last N days
         top_items = (
-            NFTItem.objects.filter(
-                access_records__accessed_at__gte=cutoff,
+            NFTItemSerializer.optimize_queryset(NFTItem.objects.all(), fields)
+            .filter(
+                accesses__accessed_at__gte=cutoff,
             )
             .annotate(
-                access_count=Count("access_records"),
-                last_access=Max("access_records__accessed_at"),
+                access_count=Count("accesses"),
+                last_access=Max("accesses__accessed_at"),
             )
             .filter(access_count__gt=0)
             .order_by("-access_count", "-last_access")[:limit]
         )
 
-        serializer = NFTItemSerializer(top_items, many=True)
+        serializer = NFTItemSerializer(top_items, many=True, fields=fields)
         return Response({"results": serializer.data})
+
+
+class NFTPriceHistoryAPI(APIView):
+    """Série histórica de preços de um item para gráficos."""
+
+    permission_classes = [AllowAny]
+
+    @nft_price_history_schema
+    def get(self, request, product_code):
+        params = PriceHistoryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        item_id = (
+            NFTItem.objects.filter(product_code=product_code)
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if item_id is None:
+            return Response(
+                {"detail": "Item não encontrado"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        end = params.validated_data.get("end") or timezone.now()
+        start = params.validated_data.get("start") or end - timedelta(days=7)
+        interval = params.validated_data.get("interval")
+        points = price_history(item_id, start, end, interval)
+        return Response(
+            {
+                "product_code": product_code,
+                "start": start,
+                "end": end,
+                "interval": interval,
+                "points": PricePointSerializer(points, many=True).data,
+            }
+        )
+
+
+def _encode_listing_cursor(listing) -> str:
+    raw = json.dumps([str(listing["price_brl"]), listing["id"]])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_listing_cursor(cursor: str):
+    try:
+        price, order_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return Decimal(price), str(order_id)
+    except Exception:
+        return None
+
+
+class NFTItemListingsAPI(APIView):
+    """
+    Listagens ativas de um product_code, já convertidas (ETH/USD/BRL com markup).
+    O livro de ofertas vem do cache compartilhado (nft.orderbook_cache), então
+    todos os visitantes custam uma única consulta à Immutable por TTL.
+    """
+
+    permission_classes = [AllowAny]
+
+    @nft_listings_schema
+    @request_wait()
+    def get(self, request, product_code):
+        params = ListingQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        page_size = params.validated_data["page_size"]
+        cursor = params.validated_data.get("cursor")
+        after = _decode_listing_cursor(cursor) if cursor else None
+        if cursor and after is None:
+            return Response(
+                {"detail": "cursor inválido"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        # Only items already in the catalog: unknown codes must not spend the
+        # Immutable rate budget
+        if not NFTItem.objects.filter(product_code=product_code).exists():
+            return Response(
+                {"detail": "Item não encontrado"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            listings = OrderBookSnapshot.fetch(product_code).listings()
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ImmutableAPIError:
+            return Response(
+                {"detail": "Falha ao consultar a Immutable"},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+
+        # Keyset pagination on (price_brl, id): stable while the order book changes
+        if after is not None:
+            listings = [
+                listing
+                for listing in listings
+                if (listing["price_brl"], listing["id"]) > after
+            ]
+        page = listings[:page_size]
+        next_url = None
+        if len(listings) > page_size:
+            query = request.query_params.copy()
+            query["cursor"] = _encode_listing_cursor(page[-1])
+            next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+        body = {
+            "product_code": product_code,
+            "next": next_url,
+            "results": ListingSerializer(page, many=True).data,
+        }
+        etag = (
+            '"%s"'
+            % hashlib.sha1(
+                json.dumps(body, sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest()
+        )
+        max_age = getattr(settings, "IMMUTABLE_ORDERBOOK_CACHE_TTL", 30)
+        if etag_matches(etag, request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(body)
+        response["ETag"] = etag
+        response["Cache-Control"] = f"public, max-age={max_age}"
+        return response
+
+
+class NFTTypeaheadAPI(APIView):
+    """
+    Autocomplete por prefixo de itens e coleções, servido do índice em memória
+    de nft.typeahead (sincronizado entre workers pelo cache, sem ir ao banco).
+    """
+
+    permission_classes = [AllowAny]
+
+    @nft_typeahead_schema
+    def get(self, request):
+        params = TypeaheadQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data["q"]
+        results = typeahead.search(query, params.validated_data["limit"])
+        return Response(
+            {
+                "query": query,
+                "results": TypeaheadEntrySerializer(results, many=True).data,
+            }
+        )
@@ -0,0 +1,223 @@
+"""Batched persistence of refreshed NFT prices."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .history import record_price_observations
+from .models import NFTItem
+from .services import compute_price_fingerprint
+from .signals import prices_changed
+
+logger = logging.getLogger(__name__)
+
+# Campos sobrescritos a cada atualização de preço
+PRICE_UPDATE_FIELDS = [
+    "last_price_eth",
+    "last_price_usd",
+    "last_price_brl",
+    "name",
+    "image_url",
+    "blueprint",
+    "type",
+    "rarity",
+    "item_type",
+    "item_sub_type",
+    "product_type",
+    "material",
+    "is_crafted_item",
+    "is_craft_material",
+    "number",
+    "price_fingerprint",
+    "updated_at",
+]
+
+# Still written when the fingerprint is unchanged: the volatility EWMA decays on
+# every refresh. updated_at is left alone, so unchanged rows keep their ETags
+TOUCH_FIELDS = ["price_volatility"]
+
+# (product_code, pk, values) queued for a write
+_Row = Tuple[str, int, Dict[str, Any]]
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+FAILED = "failed"
+
+
+class PriceBatchWriter:
+    """Collect refreshed `mapped_data` dicts and write them in one statement per chunk.
+
+    On PostgreSQL the chunk is applied with a single UPDATE ... FROM (VALUES ...);
+    elsewhere with bulk_update. flush() returns the outcome per product_code
+    (updated / unchanged / not_found / failed) so callers can report or retry
+    individually.
+
+    Items whose price_fingerprint equals the stored one only get their
+    TOUCH_FIELDS (those among the writer's fields) written, keeping updated_at,
+    with no history observation and no prices_changed. After commit, prices_changed is sent with
+    the product_codes actually updated.
+    Each written row also appends an observation to the price history.
+    """
+
+    def __init__(self, fields: Optional[List[str]] = None, batch_size: int = 500):
+        self.fields = list(fields or PRICE_UPDATE_FIELDS)
+        self.batch_size = batch_size
+        self._pending: Dict[str, Tuple[Optional[int], Dict[str, Any]]] = {}
+        self._stored: Dict[str, str] = {}
+        self.outcomes: Dict[str, str] = {}
+
+    def add(
+        self,
+        product_code: str,
+        mapped_data: Dict[str, Any],
+        pk: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+    ) -> None:
+        """Queue an item; pass pk (and the stored fingerprint) when already known
+        to skip the lookup query.
+        """
+        self._pending[product_code] = (pk, mapped_data)
+        if fingerprint is not None:
+            self._stored[product_code] = fingerprint
+
+    def add_failure(self, product_code: str) -> None:
+        self.outcomes[product_code] = FAILED
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def changed(self) -> List[str]:
+        """product_codes written by the previous flush() calls."""
+        return [code for code, o in self.outcomes.items() if o == UPDATED]
+
+    def _resolve_pks(self) -> None:
+        missing = [code for code, (pk, _) in self._pending.items() if pk is None]
+        if not missing:
+            return
+        found = {
+            code: (pk, fingerprint)
+            for code, pk, fingerprint in NFTItem.objects.filter(
+                product_code__in=missing
+            ).values_list("product_code", "pk", "price_fingerprint")
+        }
+        for code in missing:
+            if code in found:
+                pk, fingerprint = found[code]
+                self._pending[code] = (pk, self._pending[code][1])
+                self._stored.setdefault(code, fingerprint)
+            else:
+                del self._pending[code]
+                self.outcomes[code] = NOT_FOUND
+
+    def _rows(self) -> Tuple[List[_Row], List[_Row]]:
+        """Split the queued items into (changed rows, unchanged rows)."""
+        now = timezone.now()
+        rows = []
+        unchanged = []
+        for code, (pk, mapped) in self._pending.items():
+            values = {**mapped, "updated_at": now}
+            if not values.get("price_fingerprint"):
+                values["price_fingerprint"] = compute_price_fingerprint(mapped)
+            if any(f not in values for f in self.fields):
+                self.outcomes[code] = FAILED
+                continue
+            if values["price_fingerprint"] == self._stored.get(code):
+                self.outcomes[code] = UNCHANGED
+                unchanged.append((code, pk, values))
+                continue
+            rows.append((code, pk, values))
+        return rows, unchanged
+
+    def _touch(self, rows: List[_Row]) -> None:
+        fields = [f for f in TOUCH_FIELDS if f in self.fields]
+        if not rows or not fields:
+            return
+        objs = []
+        for _, pk, values in rows:
+            obj = NFTItem(pk=pk)
+            for name in fields:
+                setattr(obj, name, values[name])
+            objs.append(obj)
+        try:
+            with transaction.atomic():
+                NFTItem.objects.bulk_update(objs, fields, batch_size=self.batch_size)
+        except Exception as e:
+            # The prices themselves are current; only the bookkeeping is lost
+            logger.error("Falha ao registrar %d itens inalterados: %s", len(rows), e)
+
+    def _update_from_values(self, rows: List[Tuple[str, int, Dict[str, Any]]]) -> None:
+        qn = connection.ops.quote_name
+        opts = NFTItem._meta
+        fields = [opts.get_field(name) for name in self.fields]
+        pk_col = qn(opts.pk.column)
+        cols = ", ".join(qn(f.column) for f in fields)
+        set_clause = ", ".join(f"{qn(f.column)} = v.{qn(f.column)}" for f in fields)
+        placeholder = (
+            "(%s::bigint, "
+            + ", ".join(f"%s::{f.db_type(connection)}" for f in fields)
+            + ")"
+        )
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start : start + self.batch_size]
+            params: List[Any] = []
+            for _, pk, values in batch:
+                params.append(pk)
+                params.extend(
+                    f.get_db_prep_save(values[f.name], connection) for f in fields
+                )
+            sql = (
+                f"UPDATE {qn(opts.db_table)} AS t SET {set_clause} "
+                f"FROM (VALUES {', '.join([placeholder] * len(batch))}) "
+                f"AS v({pk_col}, {cols}) WHERE t.{pk_col} = v.{pk_col}"
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+
+    def _bulk_update(self, rows: List[Tuple[str, int, Dict[str, Any]]]) -> None:
+        objs = []
+        for _, pk, values in rows:
+            obj = NFTItem(pk=pk)
+            for name in self.fields:
+                setattr(obj, name, values[name])
+            objs.append(obj)
+        NFTItem.objects.bulk_update(objs, self.fields, batch_size=self.batch_size)
+
+    def flush(self) -> Dict[str, str]:
+        """Write every queued item and return the accumulated outcomes."""
+        if not self._pending:
+            return self.outcomes
+        self._resolve_pks()
+        rows, unchanged = self._rows()
+        self._touch(unchanged)
+        if rows:
+            try:
+                with transaction.atomic():
+                    if connection.vendor == "postgresql":
+                        self._update_from_values(rows)
+                    else:
+                        self._bulk_update(rows)
+                    record_price_observations(
+                        ((pk, values) for _, pk, values in rows),
+                        observed_at=rows[0][2]["updated_at"],
+                    )
+                for code, _, _ in rows:
+                    self.outcomes[code] = UPDATED
+                changed = [code for code, _, _ in rows]
+                transaction.on_commit(
+                    lambda: prices_changed.send(
+                        sender=self.__class__, product_codes=changed
+                    )
+                )
+            except Exception as e:
+                logger.error("Falha na escrita em lote de %d itens: %s", len(rows), e)
+                for code, _, _ in rows:
+                    self.outcomes[code] = FAILED
+        self._pending.clear()
+        self._stored.clear()
+        return self.outcomes